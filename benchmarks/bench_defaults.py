@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding=utf-8 -*-
+
+"""attribute access of defaults on a 5-level model hierarchy
+
+python benchmarks/bench_defaults.py [number of calls]
+"""
+
+import sys
+import timeit
+
+from flaskmongorm import BaseModel
+
+
+class A(BaseModel):
+    __default_values__ = dict(a=1)
+
+
+class B(A):
+    __default_values__ = dict(b=2)
+
+
+class C(B):
+    __default_values__ = dict(c=3)
+
+
+class D(C):
+    __default_values__ = dict(d=4)
+
+
+class E(D):
+    __default_values__ = dict(e=5, a=10)
+
+
+def main(number: int = 200000) -> None:
+    obj = E(name="x")
+    cases = dict(
+        field=lambda: obj.name,
+        default_attr=lambda: obj.a,
+        default_item=lambda: obj["b"],
+        missing_attr=lambda: obj.missing,
+        to_dict=lambda: obj.to_dict(deep=False),
+    )
+    for name, func in cases.items():
+        seconds = timeit.timeit(func, number=number)
+        print(f"{name:<14} {seconds / number * 1e9:8.0f} ns/call")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
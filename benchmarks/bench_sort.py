@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding=utf-8 -*-
+
+"""cached vs uncached get_sort() for distinct sort strings
+
+python benchmarks/bench_sort.py [number of sort strings]
+"""
+
+import random
+import sys
+import timeit
+
+from flaskmongorm import clear_sort_cache, get_sort, get_sort_cache_info, parse_sort
+
+FIELDS = ["created", "name", "age", "score", "updated", "email", "city", "level", "_id"]
+
+
+def make_sorts(size: int) -> list:
+    assert size <= 4000, "not enough distinct sort strings"
+    rand = random.Random(0)
+    sorts = set()
+    while len(sorts) < size:
+        fields = rand.sample(FIELDS, rand.randint(1, 3))
+        sorts.add(", ".join(f"{f} {rand.choice(['asc', 'desc'])}" for f in fields))
+
+    return sorted(sorts)
+
+
+def uncached(sort: str) -> list:
+    return list(parse_sort.__wrapped__(sort)[0])
+
+
+def main(size: int = 2000) -> None:
+    sorts = make_sorts(size)
+    queries = sorts * 20  # every sort string is used again and again
+    random.Random(1).shuffle(queries)
+    clear_sort_cache()
+    cached_time = timeit.timeit(lambda: [get_sort(s) for s in queries], number=1)
+    uncached_time = timeit.timeit(lambda: [uncached(s) for s in queries], number=1)
+    print(f"{len(sorts)} sort strings, {len(queries)} calls")
+    print(f"uncached: {uncached_time / len(queries) * 1e6:.2f} us/call")
+    print(f"cached:   {cached_time / len(queries) * 1e6:.2f} us/call")
+    print(get_sort_cache_info())
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
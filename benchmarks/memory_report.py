@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding=utf-8 -*-
+
+"""memory of 100k model objects, default layout vs declared __fields__
+
+python benchmarks/memory_report.py [number of documents]
+"""
+
+import datetime
+import gc
+import sys
+import tracemalloc
+
+from bson.objectid import ObjectId
+
+from flaskmongorm import BaseModel
+
+FIELDS = ["_id", "name", "email", "age", "city", "created", "score", "active"]
+
+
+class Plain(BaseModel):
+    __collection__ = "users"
+
+
+class Compact(BaseModel):
+    __collection__ = "users"
+    __fields__ = FIELDS
+
+
+def make_docs(size: int) -> list:
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return [
+        dict(
+            _id=ObjectId(),
+            name=f"user{i}",
+            email=f"user{i}@example.com",
+            age=i % 90,
+            city="city",
+            created=now,
+            score=i * 1.5,
+            active=True,
+        )
+        for i in range(size)
+    ]
+
+
+def measure(model: type, docs: list) -> int:
+    """bytes allocated by objects of docs (document values are shared)"""
+    gc.collect()
+    tracemalloc.start()
+    objects = [model(**doc) for doc in docs]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return size
+
+
+def main(size: int = 100000) -> None:
+    docs = make_docs(size)
+    plain = measure(Plain, docs)
+    compact = measure(Compact, docs)
+    print(f"{size} documents of {len(FIELDS)} fields")
+    print(f"__dict__: {plain / 1e6:8.1f} MB ({plain / size:.0f} bytes/object)")
+    print(f"__slots__:{compact / 1e6:8.1f} MB ({compact / size:.0f} bytes/object)")
+    print(f"saved:    {(1 - compact / plain) * 100:8.1f} %")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -1,7 +1,22 @@
 #!/usr/bin/env python3
 # -*- coding=utf-8 -*-
 
+import base64
+import contextlib
+import contextvars
 import copy
+import datetime
+import functools
+import hashlib
+import heapq
+import itertools
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import ChainMap, OrderedDict
+from collections.abc import Mapping
+from types import MappingProxyType
 from typing import Any, Union
 
 try:
@@ -9,9 +24,21 @@ try:
 except ImportError:
     from backports import zoneinfo
 
-from bson.codec_options import CodecOptions
+import bson
+from bson.codec_options import DEFAULT_CODEC_OPTIONS, CodecOptions
+from bson.errors import InvalidDocument
+from bson.json_util import RELAXED_JSON_OPTIONS, JSONOptions, dumps
 from bson.objectid import ObjectId
-from flask import current_app, request
+from bson.raw_bson import RawBSONDocument
+from flask import (
+    Response,
+    current_app,
+    g,
+    has_app_context,
+    has_request_context,
+    request,
+    stream_with_context,
+)
 from flask_pymongo import PyMongo
 from flask_pymongo.wrappers import Collection, Database, MongoClient
 from pymongo import (
@@ -22,8 +49,23 @@ from pymongo import (
     HASHED,
     TEXT,
     IndexModel,
+    ReadPreference,
 )
 from pymongo.cursor import CursorType
+from pymongo.errors import PyMongoError
+from pymongo.read_preferences import make_read_preference, read_pref_mode_from_name
+
+from .changestream import ChangeStreamConsumer, MaterializedView
+from .metrics import (
+    CommandMetrics,
+    MeteredCursor,
+    disable_metrics,
+    enable_metrics,
+    metrics_response,
+)
+from .pool import POOL_OPTIONS, PoolMetrics, get_pool_options
+from .utils import get_field_value
+from .writer import BULK_WRITERS, BulkWriter, flush_bulk_writers
 
 __version__ = "2024.08.23"
 
@@ -40,12 +82,57 @@ INDEX_NAMES = dict(
 SORT_NAMES = dict(
     asc=ASCENDING, ascending=ASCENDING, desc=DESCENDING, descending=DESCENDING
 )
-
-
-def get_sort(sort: Any = None, for_index: bool = False) -> Any:
-    if sort is None or isinstance(sort, list) and not for_index:
-        return sort
-
+# how find() gets cursor.total
+# none: no count
+# exact: count_documents()
+# estimated: estimated_document_count() if no filter else count_documents()
+# capped: count_documents() which stops at limit
+# facet: get page and total in one aggregation ($facet)
+COUNT_STRATEGIES = ("none", "exact", "estimated", "capped", "facet")
+TRANSACTION_TIMEOUT = 120  # seconds to retry transaction/commit
+# collection methods which clear query cache of model
+CACHE_WRITE_ACTIONS = frozenset(
+    (
+        "insert_one",
+        "insert_many",
+        "update_one",
+        "update_many",
+        "replace_one",
+        "delete_one",
+        "delete_many",
+        "find_one_and_delete",
+        "find_one_and_replace",
+        "find_one_and_update",
+        "bulk_write",
+        "drop",
+        "rename",
+    )
+)
+CACHE_KEY_ARGS = frozenset(("filter", "projection", "sort", "skip", "limit"))
+# {id(query cache): last write}, for backends without version
+CACHE_WRITES = {}
+cache_writes = itertools.count()
+# options of reads, see get_read_preference()
+READ_OPTIONS = ("read_preference", "max_staleness", "analytics")
+FANOUT_WORKERS = 8  # threads of queries across db keys, see find_fanout()
+fanout_executor = None
+fanout_lock = threading.Lock()
+# {obj: (raw bson, codec options)} as loaded, for __track_changes__ models
+SNAPSHOTS = weakref.WeakKeyDictionary()
+# {obj: {name: related}} set by prefetch, read as attributes of obj
+RELATED = weakref.WeakKeyDictionary()
+# {session: models written in its transaction}, see clear_transaction_caches()
+TRANSACTION_WRITES = weakref.WeakKeyDictionary()
+# sessions of Model.transaction() blocks if no flask app context
+current_sessions = contextvars.ContextVar("flaskmongorm_sessions", default=None)
+
+
+SORT_CACHE_SIZE = 4096  # max parsed sort/index specs kept in memory
+
+
+@functools.lru_cache(maxsize=SORT_CACHE_SIZE)
+def parse_sort(sort: str, for_index: bool = False) -> tuple:
+    """parse sort/index string into (immutable) tuples, result is cached"""
     sorts = []
     names_map = INDEX_NAMES if for_index else SORT_NAMES
     for items in sort.strip().split(";"):  # ; for many indexes
@@ -62,9 +149,34 @@ def get_sort(sort: Any = None, for_index: bool = False) -> Any:
                         lst.append((item, names_map["asc"]))
 
             if lst:
-                sorts.append(lst)
+                sorts.append(tuple(lst))
+
+    return tuple(sorts)
+
+
+def get_sort_cache_info() -> Any:
+    """hits/misses/maxsize/currsize of parsed sort specs"""
+    return parse_sort.cache_info()
+
+
+def clear_sort_cache() -> None:
+    parse_sort.cache_clear()
+
 
-    return sorts[0] if len(sorts) == 1 else sorts
+def get_sort(sort: Any = None, for_index: bool = False) -> Any:
+    if sort is None or isinstance(sort, list) and not for_index:
+        return sort
+
+    sorts = parse_sort(sort, for_index)
+    if len(sorts) == 1:
+        return list(sorts[0])
+
+    return [list(lst) for lst in sorts]
+
+
+@functools.lru_cache(maxsize=None)
+def get_zoneinfo(timezone: str) -> Any:
+    return zoneinfo.ZoneInfo(timezone)
 
 
 def get_uniq_spec(fields: list = [], doc: dict = {}) -> Any:
@@ -81,7 +193,503 @@ def get_uniq_spec(fields: list = [], doc: dict = {}) -> Any:
     return {"$or": specs} if specs else None
 
 
+def encode_cursor(values: list, direction: str = "next") -> str:
+    """opaque keyset cursor of sort values"""
+    raw = bson.encode(dict(v=values, d=direction))
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def has_operator(value: Any) -> bool:
+    """whether value has $-prefixed keys at any level"""
+    if isinstance(value, Mapping):
+        return any(str(k).startswith("$") or has_operator(v) for k, v in value.items())
+    if isinstance(value, list):
+        return any(has_operator(v) for v in value)
+
+    return False
+
+
+def decode_cursor(cursor: str, size: Union[int, None] = None) -> tuple:
+    """values and direction of encode_cursor() result
+
+    size: number of sort fields, ValueError if cursor is invalid
+    (cursors come from clients, values go to the filter)
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        doc = bson.decode(raw)
+    except Exception as ex:
+        raise ValueError(f"invalid cursor: {cursor!r}") from ex
+
+    values, direction = doc.get("v"), doc.get("d")
+    if (
+        not isinstance(values, list)
+        or (size is not None and len(values) != size)
+        or direction not in ("next", "prev")
+        or has_operator(values)
+    ):
+        raise ValueError(f"invalid cursor: {cursor!r}")
+
+    return values, direction
+
+
+def get_keyset_filter(sort: list, values: list, reverse: bool = False) -> dict:
+    """filter for documents after values in sort order (before if reverse)
+
+    sort: [(field, direction), ...] which ends with unique field (e.g. _id)
+
+    null (or missing) sorts before other values, but $gt/$lt don't match
+    across types, so nulls get their own branches
+    """
+    ors = []
+    for i, (field, direction) in enumerate(sort):
+        spec = {f: v for (f, _), v in zip(sort[:i], values)}
+        after = (direction == ASCENDING) != reverse
+        if values[i] is None:
+            if after:
+                ors.append({**spec, field: {"$ne": None}})
+        elif after:
+            ors.append({**spec, field: {"$gt": values[i]}})
+        else:
+            ors.append({**spec, field: {"$lt": values[i]}})
+            ors.append({**spec, field: None})
+
+    return ors[0] if len(ors) == 1 else {"$or": ors}
+
+
+def diff_fields(
+    old: dict, new: dict, prefix: str = "", sets: Any = None, unsets: Any = None
+) -> tuple:
+    """changed (dotted) paths from old to new: ({path: value}, {path: ""})"""
+    sets = {} if sets is None else sets
+    unsets = {} if unsets is None else unsets
+    for k, v in new.items():
+        path = f"{prefix}{k}"
+        if k not in old:
+            sets[path] = v
+        elif isinstance(v, dict) and isinstance(old[k], dict):
+            diff_fields(old[k], v, f"{path}.", sets, unsets)
+        elif type(v) is not type(old[k]) or v != old[k]:
+            sets[path] = v
+
+    for k in old:
+        if k not in new:
+            unsets[f"{prefix}{k}"] = ""
+
+    return sets, unsets
+
+
+class LazyDocument:
+    """raw bson document, decoded when first field is accessed"""
+
+    __slots__ = ("raw", "codec_options", "_doc")
+
+    def __init__(
+        self, raw: bytes, codec_options: CodecOptions = DEFAULT_CODEC_OPTIONS
+    ) -> None:
+        self.raw = raw
+        self.codec_options = codec_options
+        self._doc = None
+
+    def decode(self) -> dict:
+        if self._doc is None:
+            self._doc = bson.decode(self.raw, self.codec_options)
+
+        return self._doc
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self.decode()
+
+    def __iter__(self) -> Any:
+        return iter(self.decode())
+
+    def __getitem__(self, key: Any) -> Any:
+        return self.decode()[key]
+
+
+class QueryCache:
+    """in-process LRU cache with TTL for find()/find_one() results
+
+    other backends (e.g. redis) need same methods:
+    get(key) -> value or None, set(key, value, ttl), clear()
+    and should have version attribute changed by clear() of any process
+    (e.g. a redis counter); without it results fetched during a write are
+    only dropped for writes of this process, see get_cache_version().
+    values are raw bson bytes, or tuple of (list of bytes, total)
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+        self.version = 0  # changed by clear(), stale results are not set
+        self.hits = self.misses = 0
+
+    def get(self, key: str) -> Any:
+        with self.lock:
+            item = self.data.get(key)
+            if item is not None:
+                if item[1] > time.monotonic():
+                    self.data.move_to_end(key)
+                    self.hits += 1
+                    return item[0]
+
+                del self.data[key]
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any, ttl: Union[float, None] = None) -> None:
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self.lock:
+            self.data[key] = value, expires
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.data.clear()
+            self.version += 1
+
+
+@functools.lru_cache(maxsize=None)
+def get_read_preference(mode: str, max_staleness: int = -1) -> Any:
+    """read preference by mode name, e.g. secondaryPreferred
+
+    max_staleness is ignored for primary, which doesn't accept it
+    """
+    mode = read_pref_mode_from_name(mode)
+    if mode == ReadPreference.PRIMARY.mode:
+        max_staleness = -1
+
+    return make_read_preference(mode, None, max_staleness)
+
+
+def get_fanout_executor() -> ThreadPoolExecutor:
+    global fanout_executor
+    with fanout_lock:
+        if fanout_executor is None:
+            fanout_executor = ThreadPoolExecutor(
+                FANOUT_WORKERS, thread_name_prefix="flaskmongorm-fanout"
+            )
+
+        return fanout_executor
+
+
+def get_bson_order(value: Any) -> tuple:
+    """(type order, value) to compare values of mixed types like MongoDB"""
+    if value is None:
+        return 1, 0
+    if isinstance(value, bool):
+        return 8, value
+    if isinstance(value, (int, float)):
+        return 2, value
+    if isinstance(value, str):
+        return 3, value
+    if isinstance(value, ObjectId):
+        return 7, value
+    if isinstance(value, datetime.datetime):
+        return 9, value
+
+    return 10, repr(value)  # documents, arrays, etc. are not compared by value
+
+
+def get_merge_key(sort: list) -> Any:
+    """key function of docs ordered by get_sort() result"""
+
+    def compare(a: Any, b: Any) -> int:
+        for field, direction in sort:
+            x = get_bson_order(get_field_value(a, field))
+            y = get_bson_order(get_field_value(b, field))
+            if x != y:
+                return (-1 if x < y else 1) * (-1 if direction == DESCENDING else 1)
+
+        return 0
+
+    return functools.cmp_to_key(compare)
+
+
+def merge_sorted(results: Any, sort: list = [], skip: int = 0, limit: int = 0) -> list:
+    """k-way merge of results sorted by sort, then skip and limit"""
+    if sort:
+        merged = heapq.merge(*results, key=get_merge_key(sort))
+    else:
+        merged = itertools.chain(*results)
+
+    return list(itertools.islice(merged, skip, skip + limit if limit else None))
+
+
+class FacetCursor:
+    """result of find() with facet count or from cache, no server cursor"""
+
+    def __init__(self, objects: list, total: int) -> None:
+        self.objects = objects
+        self.total = total
+
+    def __iter__(self) -> Any:
+        return iter(self.objects)
+
+    def __len__(self) -> int:
+        return len(self.objects)
+
+    def close(self) -> None:
+        pass
+
+
+class FindIterator:
+    """stream objects of a cursor, nothing is kept in memory
+
+    count: number of objects yielded so far
+    """
+
+    def __init__(self, cursor: Any, objects: Any, batch_size: int = 0) -> None:
+        self.cursor = cursor
+        self.objects = objects
+        self.batch_size = batch_size
+        self.count = 0
+
+    def __iter__(self) -> Any:
+        try:
+            for obj in self.objects:
+                self.count += 1
+                yield obj
+        finally:
+            self.close()
+
+    def iter_batches(self, batch_size: int = 0) -> Any:
+        """yield lists of objects"""
+        it = iter(self)
+        size = batch_size or self.batch_size or 100
+        while True:
+            batch = list(itertools.islice(it, size))
+            if not batch:
+                break
+
+            yield batch
+
+    def close(self) -> None:
+        """close server cursor, e.g. stop iteration early"""
+        self.cursor.close()
+
+    def __enter__(self) -> "FindIterator":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+class LoadFuture(Future):
+    """result() sends pending loads of the loader first"""
+
+    def __init__(self, loader: "Loader") -> None:
+        super().__init__()
+        self.loader = loader
+
+    def result(self, timeout: Union[float, None] = None) -> Any:
+        if not self.done():
+            self.loader.dispatch()
+
+        return super().result(timeout)
+
+
+class Loader:
+    """batch load(id) of model into find({"_id": {"$in": ids}})
+
+    futures = [Customer.load(order.customer_id) for order in orders]
+    customers = [future.result() for future in futures]  # one query
+
+    ids are normalized by get_oid(), missing ones are None,
+    results are kept per request until the model writes.
+    """
+
+    def __init__(self, model: Any, batch_size: int = 1000, **kwargs: Any) -> None:
+        self.model = model
+        self.batch_size = batch_size
+        self.kwargs = kwargs  # find options
+        self.futures = {}  # {id: future}
+        self.pending = []
+
+    def new_future(self) -> Any:
+        return LoadFuture(self)
+
+    def add(self, id: Any) -> Any:
+        key = self.model.get_oid(id)
+        future = self.futures.get(key)
+        if future is None:
+            future = self.futures[key] = self.new_future()
+            self.pending.append(key)
+
+        return future
+
+    def load(self, id: Any) -> LoadFuture:
+        return self.add(id)
+
+    def load_many(self, ids: Any) -> list:
+        futures = [self.load(id) for id in ids]
+        return [future.result() for future in futures]
+
+    def take_batches(self) -> list:
+        keys, self.pending = self.pending, []
+        size = self.batch_size or len(keys) or 1
+        return [keys[i : i + size] for i in range(0, len(keys), size)]
+
+    def set_results(self, keys: list, objects: Any) -> None:
+        found = {obj["_id"]: obj for obj in objects}
+        for key in keys:
+            future = self.futures[key]
+            if not future.done():
+                future.set_result(found.get(key))
+
+    def set_exception(self, keys: list, ex: Exception) -> None:
+        for key in keys:
+            self.futures.pop(key).set_exception(ex)  # not kept
+
+    def dispatch(self) -> None:
+        for keys in self.take_batches():
+            try:
+                objects = self.model.find(
+                    {"_id": {"$in": keys}}, count=None, keyset=False, **self.kwargs
+                ).objects
+            except Exception as ex:
+                self.set_exception(keys, ex)
+            else:
+                self.set_results(keys, objects)
+
+
+class Reference:
+    """reference to other model, item of __references__
+
+    class Order(BaseModel):
+        __references__ = dict(customer=Reference(Customer, "customer_id"))
+
+    Order.find(prefetch=["customer"]) sets order.customer (not a field,
+    not saved); many: field is list of ids and related is list.
+    model can be a function returning the model (forward reference).
+    """
+
+    def __init__(
+        self, model: Any, field: str, foreign_field: str = "_id", many: bool = False
+    ) -> None:
+        self.model = model
+        self.field = field
+        self.foreign_field = foreign_field
+        self.many = many
+
+    def get_model(self) -> Any:
+        return self.model if isinstance(self.model, type) else self.model()
+
+    def get_ids(self, objects: list) -> list:
+        ids = {}  # keep order
+        for obj in objects:
+            value = get_field_value(obj, self.field)
+            for id in (value or []) if self.many else [value]:
+                if id is not None:
+                    ids[id] = None
+
+        return list(ids)
+
+    def get_related(self, obj: Any, found: dict) -> Any:
+        value = get_field_value(obj, self.field)
+        if self.many:
+            return [found[id] for id in value or [] if id in found]
+
+        return found.get(value)
+
+
+def set_related(obj: Any, name: str, related: Any) -> None:
+    if isinstance(obj, dict):
+        obj[name] = related
+    else:
+        RELATED.setdefault(obj, {})[name] = related
+
+
+def get_cache_version(cache: Any) -> tuple:
+    """(backend version, local writes) of cache, see clear_query_cache()"""
+    return getattr(cache, "version", None), CACHE_WRITES.get(id(cache))
+
+
+def clear_query_cache(cache: Any) -> None:
+    """clear cache, results being fetched are not cached (see get_cached)"""
+    CACHE_WRITES[id(cache)] = next(cache_writes)
+    cache.clear()
+
+
+def clear_transaction_caches(session: Any) -> None:
+    """clear caches of models written in transaction of session
+
+    readers may have cached old docs between the write and the commit
+    """
+    for model in TRANSACTION_WRITES.pop(session, ()):
+        model.clear_cache()
+
+
+def ndjson_response(
+    docs: Any, json_options: JSONOptions = RELAXED_JSON_OPTIONS, **kwargs: Any
+) -> Response:
+    """stream docs (dicts or objects) as newline-delimited json
+
+    return ndjson_response(Report.aggregate_iter(pipeline))
+    """
+
+    def generate() -> Any:
+        try:
+            for doc in docs:
+                if isinstance(doc, BaseMixin):
+                    doc = doc.to_dict(deep=False)
+
+                yield dumps(doc, json_options=json_options) + "\n"
+        finally:  # client may disconnect
+            if hasattr(docs, "close"):
+                docs.close()
+
+    kwargs.setdefault("mimetype", "application/x-ndjson")
+    return Response(stream_with_context(generate()), **kwargs)
+
+
+def route_by_header(header: str, dbkeys: dict, default: Any = None) -> Any:
+    """__router__ by request header (e.g. tenant id)
+
+    dbkeys: {header value: db key}, unknown values go to default,
+    so clients can only pick the listed databases
+    """
+    if not isinstance(dbkeys, dict):
+        raise TypeError("dbkeys must be a dict of {header value: db key}")
+
+    def route(model: Any) -> Any:
+        if not has_request_context():
+            return default
+
+        return dbkeys.get(request.headers.get(header), default)
+
+    return route
+
+
+def route_by_g(name: str, default: Any = None) -> Any:
+    """__router__ by attribute of flask.g, set by before_request handlers"""
+
+    def route(model: Any) -> Any:
+        return g.get(name, default) if has_app_context() else default
+
+    return route
+
+
 class BaseMixin:
+    __all_defaults__ = MappingProxyType({})  # merged __default_values__
+    __db_key__ = None  # fixed db key of model
+    # function(model) -> db key (None for default), see route_by_header()
+    # resolved once per app context
+    __router__ = None
+    __command_metrics__ = None  # see enable_metrics()
+    __read_preference__ = None  # mode name of reads, client default if None
+    __analytics_read_preference__ = "secondaryPreferred"  # of analytics=True
+    __max_staleness__ = None  # seconds, at least 90 for secondaries
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.reset_defaults()
+
     @classmethod
     def init_app(
         cls,
@@ -94,6 +702,12 @@ class BaseMixin:
     ) -> None:
         kwargs.setdefault("connect", False)
         kwargs.setdefault("tz_aware", True)
+        # MONGO_<DBKEY>_ pool config needs dbkey or dbname
+        for option, value in get_pool_options(app.config, dbkey or dbname).items():
+            kwargs.setdefault(option, value)
+
+        metrics = PoolMetrics()
+        kwargs["event_listeners"] = [*kwargs.get("event_listeners", []), metrics]
         mongo = PyMongo(app, uri, *args, **kwargs)
         db = None
         if mongo.db is None and dbname:
@@ -107,6 +721,8 @@ class BaseMixin:
             cls.__clients__ = {}
             cls.__dbs__ = {}
             cls.__dbkeys__ = {}
+            cls.__wrapped_colls__ = {}  # {dbkey: {(model, name, tzinfo, ...): coll}}
+            cls.__pool_metrics__ = {}  # {dbkey: PoolMetrics}
 
         if not dbkey:
             dbkey = db.name
@@ -115,11 +731,30 @@ class BaseMixin:
         cls.__mongos__[dbkey] = mongo
         cls.__clients__[dbkey] = mongo.cx
         cls.__dbs__[dbkey] = db
+        cls.__wrapped_colls__.pop(dbkey, None)
+        cls.__pool_metrics__[dbkey] = metrics
+        if flush_bulk_writers not in app.teardown_appcontext_funcs:
+            app.teardown_appcontext(flush_bulk_writers)
 
     @classmethod
     def get_db_key(cls, *args: Any, **kwargs: Any) -> str:
-        """you need overwrite it for multi db"""
-        return list(cls.__dbs__)[0]
+        """__db_key__, or by __router__, or the first registered one"""
+        if cls.__db_key__:
+            return cls.__db_key__
+
+        router = cls.__router__
+        if router is None:
+            return next(iter(cls.__dbs__))
+
+        if not has_app_context():
+            return router(cls) or next(iter(cls.__dbs__))
+
+        routes = g.setdefault("_mongo_routes", {})  # pop it to route again
+        dbkey = routes.get(cls)
+        if dbkey is None:
+            dbkey = routes[cls] = router(cls) or next(iter(cls.__dbs__))
+
+        return dbkey
 
     @property
     def id(self) -> Any:
@@ -147,59 +782,208 @@ class BaseMixin:
         extras: dict = {},
         excludes: list = [],
         onlys: list = [],
-    ) -> dict:
-        d = copy.deepcopy(self.__dict__) if deep else copy.copy(self.__dict__)
+        view: bool = False,
+    ) -> Any:
+        """fields are filtered by onlys/excludes first, then copied
+
+        view: no copy, return ChainMap over the fields (read-only usage),
+              new keys go to its first map instead of object
+        """
+        fields = self._get_fields()
+        names, keep = (), False
+        if onlys or excludes:
+            names, keep = (set(onlys), True) if onlys else (set(excludes), False)
+            fields = {k: v for k, v in fields.items() if (k in names) is keep}
+            extras = {k: v for k, v in extras.items() if (k in names) is keep}
+
+        defaults = {}
         if include_defaults:
-            for k, v in self.get_all_defaults().items():
-                d.setdefault(k, v)
+            for k, v in self.__class__.__all_defaults__.items():
+                if k not in fields and (k in names) is keep:
+                    defaults[k] = v
 
-        d.update(extras)
-        if onlys:
-            return {k: v for k, v in d.items() if k in onlys}
+        if view:
+            return ChainMap(dict(extras), fields, defaults)
 
-        return {k: v for k, v in d.items() if k not in excludes}
+        d = copy.deepcopy(fields) if deep else dict(fields)
+        d.update(defaults)
+        d.update(extras)
+        return d
 
     @classmethod
     def get_client(cls) -> MongoClient:
         return cls.__clients__[cls.get_db_key()]
 
+    @classmethod
+    def get_pool_metrics(cls, dbkey: Union[str, None] = None) -> dict:
+        """{dbkey: stats} of connection pools, or stats of dbkey"""
+        if dbkey:
+            return cls.__pool_metrics__[dbkey].get_stats()
+
+        return {k: v.get_stats() for k, v in cls.__pool_metrics__.items()}
+
     @classmethod
     def get_db(cls) -> Database:
         return cls.__dbs__[cls.get_db_key()]
 
     @classmethod
     def get_all_defaults(cls) -> dict:
-        return cls.get_class_attr("__default_values__", attr_type="dict")
+        return dict(cls.__all_defaults__)
 
-    def _get_default(self, key: Any) -> Any:
-        for kls in self.__class__.__mro__:
-            if key in kls.__dict__.get("__default_values__", {}):
-                return kls.__default_values__[key]
+    @classmethod
+    def reset_defaults(cls) -> None:
+        """call it after changing __default_values__ at runtime"""
+        cls.__all_defaults__ = MappingProxyType(
+            cls.get_class_attr("__default_values__", attr_type="dict")
+        )
+        for kls in cls.__subclasses__():
+            kls.reset_defaults()
 
-        return None
+    def _get_default(self, key: Any) -> Any:
+        return self.__class__.__all_defaults__.get(key)
 
     def __getitem__(self, key: Any) -> Any:
-        return self.__dict__.get(key, self._get_default(key))
+        if key in self.__dict__:
+            return self.__dict__[key]
+
+        return self.__class__.__all_defaults__.get(key)
 
     def __setitem__(self, key: Any, value: Any) -> None:
         self.__dict__[key] = value
 
     def __repr__(self) -> str:
-        return f"{self.__dict__}"
+        return f"{self._get_fields()}"
+
+    def _get_fields(self) -> dict:
+        """document fields of the instance"""
+        return self.__dict__
 
     def __getattr__(self, key: Any) -> Any:
         """return default value instead of key error"""
-        return self._get_default(key)
+        if RELATED:
+            related = RELATED.get(self)
+            if related is not None and key in related:
+                return related[key]
+
+        return self.__class__.__all_defaults__.get(key)
 
     @classmethod
     def get_collection(cls) -> Collection:
         return cls.get_db()[cls.__dict__["__collection__"]]
 
     @classmethod
-    def get_wrapped_coll(cls, kwargs: dict) -> Collection:
+    def get_collection_name(cls) -> str:
+        """name of get_collection(), which is called only if overridden"""
+        if cls.get_collection.__func__ is BaseMixin.get_collection.__func__:
+            return cls.__dict__["__collection__"]
+
+        return cls.get_collection().name
+
+    @classmethod
+    def get_wrapped_coll(
+        cls,
+        kwargs: dict,
+        raw: bool = False,
+        dbkey: Union[str, None] = None,
+        read_preference: Any = None,
+    ) -> Collection:
+        """tz-aware collection, cached per (model, db key, collection name,
+        tzinfo, raw, read preference)
+
+        raw: return RawBSONDocument instead of dict
+        dbkey: db key instead of get_db_key()
+        read_preference: resolved one instead of read options in kwargs
+        """
         tzinfo = cls.get_tzinfo(**kwargs)
         kwargs.pop("timezone", None)
-        return cls.wrap_coll_tzinfo(cls.get_collection(), tzinfo)
+        pref = cls.get_read_preference(kwargs)
+        if read_preference is not None:
+            pref = read_preference
+
+        name = cls.__dict__["__collection__"] if dbkey else cls.get_collection_name()
+        key = (cls, name, tzinfo, raw, None if pref is None else repr(pref))
+        colls = cls.__wrapped_colls__.setdefault(dbkey or cls.get_db_key(), {})
+        try:
+            return colls[key]
+        except KeyError:
+            if dbkey:
+                coll = cls.__dbs__[dbkey][cls.__dict__["__collection__"]]
+            else:
+                coll = cls.get_collection()
+
+            coll = cls.wrap_coll_tzinfo(coll, tzinfo)
+            if raw:
+                coll = coll.with_options(
+                    codec_options=coll.codec_options.with_options(
+                        document_class=RawBSONDocument
+                    )
+                )
+
+            if pref is not None:
+                coll = coll.with_options(read_preference=pref)
+
+            colls[key] = coll
+            return coll
+
+    @classmethod
+    def get_raw_coll(cls, coll: Collection, kwargs: dict) -> Collection:
+        """RawBSONDocument version of coll from get_wrapped_coll()
+
+        read options are popped by the first lookup, so keep the
+        read preference of coll
+        """
+        pref = coll.read_preference
+        if pref is coll.database.read_preference:  # not routed
+            pref = None
+
+        return cls.get_wrapped_coll(kwargs, raw=True, read_preference=pref)
+
+    @classmethod
+    def get_read_options(cls, kwargs: dict) -> dict:
+        """read options of kwargs, see get_read_preference()"""
+        return {k: kwargs[k] for k in READ_OPTIONS if k in kwargs}
+
+    @classmethod
+    def get_read_coll(cls, kwargs: dict) -> Collection:
+        """collection with read preference of read options in kwargs"""
+        pref = cls.get_read_preference(kwargs)
+        if pref is None:
+            return cls.get_collection()
+
+        colls = cls.__wrapped_colls__.setdefault(cls.get_db_key(), {})
+        key = (cls, cls.get_collection_name(), "read", repr(pref))
+        coll = colls.get(key)
+        if coll is None:
+            coll = colls[key] = cls.get_collection().with_options(read_preference=pref)
+
+        return coll
+
+    @classmethod
+    def get_read_preference(cls, kwargs: dict) -> Any:
+        """pop read options, None for client default
+
+        read_preference: mode name (primary, secondaryPreferred, nearest...)
+        or pymongo read preference, default is __read_preference__
+        max_staleness: maxStalenessSeconds, default is __max_staleness__
+        analytics: use __analytics_read_preference__, e.g. for reports
+        reads in transaction always use primary
+        """
+        mode = kwargs.pop("read_preference", None)
+        max_staleness = kwargs.pop("max_staleness", None)
+        if kwargs.pop("analytics", False):
+            mode = mode or cls.__analytics_read_preference__
+
+        mode = mode or cls.__read_preference__
+        if mode is None or cls.get_session() is not None:
+            return None
+
+        if not isinstance(mode, str):
+            return mode
+
+        if max_staleness is None:
+            max_staleness = cls.__max_staleness__
+
+        return get_read_preference(mode, max_staleness or -1)
 
     @classmethod
     def is_unique(
@@ -228,10 +1012,14 @@ class BaseMixin:
 
     @classmethod
     def get_tzinfo(cls, **kwargs: Any) -> Any:
-        timezone = current_app.config.get("TIMEZONE") or cls.__timezone__
+        """TIMEZONE config of app, __timezone__ outside app context"""
+        timezone = cls.__timezone__
+        if has_app_context():
+            timezone = current_app.config.get("TIMEZONE") or timezone
+
         if timezone:
             if isinstance(timezone, str):
-                return zoneinfo.ZoneInfo(timezone)
+                return get_zoneinfo(timezone)
 
             return timezone
 
@@ -300,12 +1088,52 @@ class BaseMixin:
         kwargs.update(sort=get_sort(kwargs.get("sort")))
 
     def save(self, *args: Any, **kwargs: Any) -> Any:
-        """not pymongo save() method"""
+        """not pymongo save() method
+
+        without update args, only changed fields are updated if the
+        object is loaded with __track_changes__
+        """
         if self.id:
+            if not args and self not in SNAPSHOTS:
+                raise TypeError(
+                    "save() needs update args, or object loaded with __track_changes__"
+                )
+
+            if not args:
+                update = self.get_changes()
+                if not update:
+                    return None
+
+                result = self.__class__.update_one(dict(_id=self.id), update, **kwargs)
+                if not isinstance(result, str):  # not error
+                    self.reset_changes()
+
+                return result
+
             return self.__class__.update_one(dict(_id=self.id), *args, **kwargs)
 
         return self.__class__.insert_one(self.to_dict(), **kwargs)
 
+    def get_changes(self) -> dict:
+        """$set/$unset update of fields changed since loaded"""
+        raw, codec_options = SNAPSHOTS[self]
+        old = bson.decode(raw, codec_options)
+        sets, unsets = diff_fields(old, self._get_fields())
+        sets.pop("_id", None)
+        update = {}
+        if sets:
+            update["$set"] = sets
+
+        if unsets:
+            update["$unset"] = unsets
+
+        return update
+
+    def reset_changes(self) -> None:
+        """take current fields as saved"""
+        raw, codec_options = SNAPSHOTS[self]
+        SNAPSHOTS[self] = bson.encode(self._get_fields()), codec_options
+
     def destroy(self, **kwargs: Any) -> Any:
         return self.__class__.delete_one(dict(_id=self.id), **kwargs)
 
@@ -361,6 +1189,11 @@ class BaseMixin:
         if no_session is True:
             return func(*args, **kwargs)
 
+        sess = cls.get_session()
+        if sess is not None:  # inside Model.transaction()
+            kwargs.setdefault("session", sess)
+            return func(*args, **kwargs)
+
         if cls.__use_transaction__ and cls.__support_transaction__:
             with cls.get_client().start_session() as sess:
                 kwargs.setdefault("session", sess)
@@ -369,14 +1202,110 @@ class BaseMixin:
 
         return func(*args, **kwargs)
 
+    @classmethod
+    def _get_sessions(cls) -> dict:
+        if has_app_context():
+            if "_mongo_sessions" not in g:
+                g._mongo_sessions = {}
+
+            return g._mongo_sessions
+
+        sessions = current_sessions.get()
+        if sessions is None:
+            sessions = {}
+            current_sessions.set(sessions)
+
+        return sessions
+
+    @classmethod
+    def get_session(cls) -> Any:
+        """session of current transaction() block"""
+        if has_app_context():
+            sessions = g.get("_mongo_sessions")
+        else:
+            sessions = current_sessions.get()
+
+        return sessions.get(cls.get_db_key()) if sessions else None
+
+    @classmethod
+    @contextlib.contextmanager
+    def transaction(cls, **kwargs: Any) -> Any:
+        """run operations of the block in one session and transaction
+
+        with Model.transaction():
+            obj.save()
+            Model.update_one(...)
+
+        commit once at the end (retried on UnknownTransactionCommitResult),
+        nested blocks join the outer transaction.
+        use run_in_transaction() to retry on TransientTransactionError.
+        """
+        sess = cls.get_session()
+        if sess is not None:
+            yield sess
+            return
+
+        sessions = cls._get_sessions()
+        dbkey = cls.get_db_key()
+        with cls.get_client().start_session() as sess:
+            sess.start_transaction(**kwargs)
+            sessions[dbkey] = sess
+            try:
+                yield sess
+            except BaseException:
+                if sess.in_transaction:
+                    sess.abort_transaction()
+
+                raise
+            else:
+                cls.commit_transaction(sess)
+                clear_transaction_caches(sess)
+            finally:
+                sessions.pop(dbkey, None)
+                TRANSACTION_WRITES.pop(sess, None)
+
+    @classmethod
+    def commit_transaction(cls, sess: Any) -> None:
+        deadline = time.monotonic() + TRANSACTION_TIMEOUT
+        while True:
+            try:
+                return sess.commit_transaction()
+            except PyMongoError as ex:
+                if (
+                    ex.has_error_label("UnknownTransactionCommitResult")
+                    and time.monotonic() < deadline
+                ):
+                    continue
+
+                raise
+
+    @classmethod
+    def run_in_transaction(cls, func: Any, *args: Any, **kwargs: Any) -> Any:
+        """call func in transaction(), retry on TransientTransactionError"""
+        deadline = time.monotonic() + TRANSACTION_TIMEOUT
+        while True:
+            try:
+                with cls.transaction():
+                    return func(*args, **kwargs)
+            except PyMongoError as ex:
+                if (
+                    ex.has_error_label("TransientTransactionError")
+                    and time.monotonic() < deadline
+                    and cls.get_session() is None  # not nested
+                ):
+                    continue
+
+                raise
+
     def clean_for_dirty(self, doc: dict = {}, keys: list = []) -> Any:
         """Remove non-changed items."""
         cleaned = {}
+        fields = self._get_fields()
         for k in keys or list(doc):
             if k == "_id":
                 return
 
-            if k in doc and self.__dict__.get(k) != doc[k]:
+            if k in doc and fields.get(k) != doc[k]:
                 cleaned[k] = doc[k]
 
         return cleaned
@@ -389,7 +1318,161 @@ class BaseMixin:
 
     @classmethod
     def _run(cls, action: str, *args: Any, **kwargs: Any) -> Any:
-        return cls.with_session(action, *args, **kwargs)
+        metrics = cls.__command_metrics__
+        if metrics is None:
+            result = cls.with_session(action, *args, **kwargs)
+        else:
+            result = metrics.run(cls, action, *args, **kwargs)
+
+        if getattr(action, "__name__", action) in CACHE_WRITE_ACTIONS:
+            cls._after_write()
+
+        return result
+
+    @classmethod
+    def _after_write(cls) -> None:
+        """clear cache after a write, and again on commit of transaction"""
+        cls.clear_cache()
+        sess = cls.get_session()
+        if sess is not None:
+            TRANSACTION_WRITES.setdefault(sess, set()).add(cls)
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """clear query cache, identity map and loaders of current context"""
+        cache = getattr(cls, "__cache__", None)
+        if cache is not None:
+            clear_query_cache(cache)
+
+        key = (cls.get_db_key(), cls.__collection__)
+        if has_app_context() and "_mongo_identity_maps" in g:
+            g._mongo_identity_maps.pop(key, None)
+
+        loaders = cls.get_loaders()
+        if loaders:
+            loaders.pop(key, None)
+
+
+class CompactMixin:
+    """store declared __fields__ in slots, other keys go to __dict__"""
+
+    __slots__ = ()
+    __slotmap__ = {}  # {field: slot descriptor}
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        slotmap = self.__slotmap__
+        for k, v in kwargs.items():
+            if k in slotmap:
+                slotmap[k].__set__(self, v)
+            else:
+                self.__dict__[k] = v
+
+    def __getitem__(self, key: Any) -> Any:
+        if key in self.__slotmap__:
+            try:
+                return self.__slotmap__[key].__get__(self)
+            except AttributeError:
+                return self.__class__.__all_defaults__.get(key)
+
+        return super().__getitem__(key)
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        if key in self.__slotmap__:
+            self.__slotmap__[key].__set__(self, value)
+        else:
+            self.__dict__[key] = value
+
+    def _get_fields(self) -> dict:
+        fields = {}
+        for k, descr in self.__slotmap__.items():
+            try:
+                fields[k] = descr.__get__(self)
+            except AttributeError:
+                pass
+
+        fields.update(self.__dict__)
+        return fields
+
+
+class LazyMixin:
+    """wrap a LazyDocument, fields are filled when changed or exported"""
+
+    __slots__ = ()
+
+    def _materialize(self) -> None:
+        lazydoc = self.__rawdoc__
+        if lazydoc is not None:
+            object.__setattr__(self, "__rawdoc__", None)
+            super().__init__(**lazydoc.decode())
+
+    def __getitem__(self, key: Any) -> Any:
+        lazydoc = self.__rawdoc__
+        if lazydoc is not None:
+            if key in lazydoc:
+                return lazydoc[key]
+
+            return self.__class__.__all_defaults__.get(key)
+
+        return super().__getitem__(key)
+
+    def __getattr__(self, key: Any) -> Any:
+        if key == "__rawdoc__":  # not initialized, e.g. copied object
+            raise AttributeError(key)
+
+        lazydoc = self.__rawdoc__
+        if lazydoc is not None and key in lazydoc:
+            return lazydoc[key]
+
+        return super().__getattr__(key)
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self._materialize()
+        super().__setitem__(key, value)
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        self._materialize()
+        super().__setattr__(key, value)
+
+    def _get_fields(self) -> dict:
+        self._materialize()
+        return super()._get_fields()
+
+
+def make_model_class(cls: Any, base: Any, mixin: Any, slots: tuple = ()) -> Any:
+    ns = dict(
+        __slots__=slots,
+        __module__=cls.__module__,
+        __qualname__=cls.__qualname__,
+        __generated__=True,
+    )
+    for name in ("__collection__", "__indexes__", "__unique_fields__"):
+        if name in cls.__dict__:  # not inherited attrs
+            ns[name] = cls.__dict__[name]
+
+    return type(cls.__name__, (mixin, base), ns)
+
+
+def make_compact_class(cls: Any) -> Any:
+    """slotted subclass of model for its declared __fields__"""
+    fields = []
+    for field in cls.get_class_attr("__fields__"):
+        if (
+            field not in fields
+            and field.isidentifier()
+            and not field.startswith("__")
+            and not hasattr(cls, field)
+        ):
+            fields.append(field)
+
+    kls = make_model_class(cls, cls, CompactMixin, tuple(fields))
+    kls.__slotmap__ = {f: kls.__dict__[f] for f in fields}
+    return kls
+
+
+def make_lazy_class(cls: Any) -> Any:
+    """subclass of model which is built from raw bson"""
+    base = cls.__compactcls__ or cls
+    return make_model_class(cls, base, LazyMixin, ("__rawdoc__",))
 
 
 class BaseModel(BaseMixin):
@@ -409,54 +1492,820 @@ class BaseModel(BaseMixin):
     __background_index__ = None
     __support_transaction__ = False
     __use_transaction__ = False
+    # declared fields are stored in __slots__ to save memory,
+    # undeclared fields still go to __dict__
+    __fields__ = []
+    # build objects from raw bson, and decode fields when accessed
+    __lazy__ = False
+    __count__ = None  # default count strategy of find(), see COUNT_STRATEGIES
+    __count_limit__ = 1000  # max number for capped count
+    __keyset__ = False  # paginate by sort values (cursor) instead of skip
+    __bulk_size__ = 1000  # flush size of get_bulk_writer()
+    __bulk_delay__ = 1.0  # flush delay (seconds) of get_bulk_writer()
+    # keep loaded document, save() without args updates changed fields only
+    __track_changes__ = False
+    # query cache of find()/find_one(), True for QueryCache or other backend
+    # cleared when the model writes, see CACHE_WRITE_ACTIONS
+    __cache__ = None
+    __cache_ttl__ = 60  # seconds
+    __resume_tokens__ = "flaskmongorm_resume_tokens"  # see ChangeStreamConsumer
+    # same object for same _id in app context, cleared when the model writes
+    __identity_map__ = False
+    __loader_class__ = Loader
+    __references__ = {}  # {name: Reference}
+    # max limit of find(prefetch=...) to join by $lookup instead of $in
+    __lookup_limit__ = 50
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if cls.__dict__.get("__cache__") is True:
+            cls.__cache__ = QueryCache(ttl=cls.__cache_ttl__)
+
+        if not cls.__dict__.get("__generated__"):
+            cls.__compactcls__ = None
+            if cls.get_class_attr("__fields__"):
+                cls.__compactcls__ = make_compact_class(cls)
+
+            cls.__lazycls__ = make_lazy_class(cls)
+
+    def __new__(cls, *args: Any, **kwargs: Any) -> Any:
+        return super().__new__(cls.__dict__.get("__compactcls__") or cls)
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         self.__dict__.update(kwargs)
 
+    @classmethod
+    def from_raw(
+        cls, raw: bytes, codec_options: CodecOptions = DEFAULT_CODEC_OPTIONS
+    ) -> Any:
+        """lazy object, fields are decoded from raw bson when needed"""
+        obj = object.__new__(cls.__lazycls__)
+        object.__setattr__(obj, "__rawdoc__", LazyDocument(raw, codec_options))
+        return obj
+
+    @classmethod
+    def get_count_strategy(cls, count: Any = None) -> str:
+        if count is True:
+            return "exact"
+
+        if not count:
+            return "none"
+
+        assert count in COUNT_STRATEGIES, f"unknown count strategy: {count}"
+        return count
+
+    @classmethod
+    def count_by(
+        cls, filter: Any = None, count: Any = "exact", **kwargs: Any
+    ) -> Union[int, None]:
+        """count documents with strategy (except facet)"""
+        count = cls.get_count_strategy(count)
+        if count == "none":
+            return None
+
+        filter = filter or {}
+        if count == "estimated" and not filter:
+            return cls.estimated_document_count(**kwargs)
+
+        if count == "capped":
+            kwargs.setdefault("limit", cls.__count_limit__)
+
+        return cls.count_documents(filter, **kwargs)
+
+    @classmethod
+    def find_facet(
+        cls, coll: Collection, filter: Any = None, *args: Any, **kwargs: Any
+    ) -> FacetCursor:
+        """get page and total in one round trip with $facet"""
+        as_raw = kwargs.pop("as_raw", False)
+        lazy = kwargs.pop("lazy", False)
+        _, convert = cls.get_converter(
+            coll, kwargs, as_raw, lazy, (filter, *args), decoded=True
+        )
+        pipeline = cls.get_facet_pipeline(filter, *args, **kwargs)
+        with contextlib.closing(cls._run(coll.aggregate, pipeline)) as cur:
+            result = next(cur, {})
+
+        return cls.get_facet_cursor(result, convert)
+
+    @classmethod
+    def get_facet_pipeline(cls, filter: Any = None, *args: Any, **kwargs: Any) -> list:
+        projection = args[0] if args else kwargs.pop("projection", None)
+        stages = []
+        if kwargs.get("sort"):
+            stages.append({"$sort": dict(kwargs["sort"])})
+
+        if kwargs.get("skip"):
+            stages.append({"$skip": kwargs["skip"]})
+
+        if kwargs.get("limit"):
+            stages.append({"$limit": kwargs["limit"]})
+
+        if projection:
+            if isinstance(projection, (list, tuple)):
+                projection = {k: 1 for k in projection}
+
+            stages.append({"$project": projection})
+
+        return [
+            {"$match": filter or {}},
+            {
+                "$facet": {
+                    "objects": stages or [{"$skip": 0}],
+                    "total": [{"$count": "n"}],
+                }
+            },
+        ]
+
+    @classmethod
+    def get_facet_cursor(cls, result: dict, convert: Any = None) -> FacetCursor:
+        """convert: docs to objects, see get_converter()"""
+        docs = result.get("objects", [])
+        total = result["total"][0]["n"] if result.get("total") else 0
+        return FacetCursor([convert(doc) for doc in docs] if convert else docs, total)
+
+    @classmethod
+    def find_keyset(cls, *args: Any, **kwargs: Any) -> Any:
+        """paginate with range filter of the last seen sort values
+
+        cursor.next_cursor and cursor.prev_cursor are passed back as
+        `cursor` (or request.args[cursor_name]) to get next/previous page
+        """
+        keyset = cls._parse_keyset_options(args, kwargs)
+        cur = cls.find(keyset["spec"], *args[1:], **kwargs)
+        cls._set_keyset_cursors(cur, keyset)
+        read = cls.get_read_options(kwargs)
+        cur.total = cls.count_by(keyset["filter"], keyset["count"], **read)
+        return cur
+
+    @classmethod
+    def _parse_keyset_options(cls, args: tuple, kwargs: dict) -> dict:
+        cursor_name = kwargs.pop("cursor_name", "cursor")
+        token = kwargs.pop("cursor", None)
+        from_request = False
+        count = cls.get_count_strategy(kwargs.pop("count", cls.__count__))
+        page_name = kwargs.pop("page_name", None)
+        per_page_name = kwargs.pop("per_page_name", None)
+        per_page = None
+        if kwargs.pop("paginate", False) and cls.__paginatecls__:
+            page_name = page_name or "page"
+            per_page_name = per_page_name or "per_page"
+            _, per_page, _ = cls.__paginatecls__.get_page_args(page_name, per_page_name)
+            if token is None:
+                token = request.args.get(cursor_name)
+                from_request = True
+
+        kwargs.pop(page_name, None)
+        kwargs.pop(per_page_name, None)
+        kwargs.pop("skip", None)
+        per_page = per_page or kwargs.pop("limit", None) or 10
+        sort = get_sort(kwargs.pop("sort", None)) or []
+        if "_id" not in {field for field, _ in sort}:
+            sort = sort + [("_id", ASCENDING)]  # tie-breaker
+
+        filter = args[0] if args else kwargs.pop("filter", None)
+        spec, reverse = filter, False
+        if token:
+            try:
+                values, direction = decode_cursor(token, len(sort))
+            except ValueError:
+                if not from_request:
+                    raise
+
+                token = None  # first page for invalid cursor of url
+            else:
+                reverse = direction == "prev"
+                keyset_filter = get_keyset_filter(sort, values, reverse)
+                spec = {"$and": [filter, keyset_filter]} if filter else keyset_filter
+
+        if reverse:
+            kwargs["sort"] = [
+                (f, DESCENDING if d == ASCENDING else ASCENDING) for f, d in sort
+            ]
+        else:
+            kwargs["sort"] = sort
+
+        kwargs.update(limit=per_page + 1, count=None, as_list=True, keyset=False)
+        return dict(
+            spec=spec,
+            filter=filter,
+            count=count,
+            token=token,
+            reverse=reverse,
+            sort=sort,
+            per_page=per_page,
+        )
+
+    @staticmethod
+    def _set_keyset_cursors(cur: Any, keyset: dict) -> None:
+        per_page, sort = keyset["per_page"], keyset["sort"]
+        token, reverse = keyset["token"], keyset["reverse"]
+        objects = cur.objects[:per_page]
+        has_more = len(cur.objects) > per_page
+        if reverse:
+            objects.reverse()
+
+        cur.objects = objects
+        cur.next_cursor = cur.prev_cursor = None
+        if objects:
+            if has_more or reverse:
+                values = [get_field_value(objects[-1], f) for f, _ in sort]
+                cur.next_cursor = encode_cursor(values, "next")
+
+            if (has_more and reverse) or (token and not reverse):
+                values = [get_field_value(objects[0], f) for f, _ in sort]
+                cur.prev_cursor = encode_cursor(values, "prev")
+
     @classmethod
     def find(cls, *args: Any, **kwargs: Any) -> Any:
         # convert to object or keep dict format
-        count = kwargs.pop("count", True)
-        as_raw = kwargs.pop("as_raw", False)
+        if kwargs.pop("keyset", cls.__keyset__):
+            return cls.find_keyset(*args, **kwargs)
+
+        related = kwargs.pop("prefetch", None) or kwargs.pop("with_related", None)
+        if related:
+            return cls.find_related(related, *args, **kwargs)
+
+        count = cls.get_count_strategy(kwargs.pop("count", cls.__count__))
         as_list = kwargs.pop("as_list", True)
+        read = cls.get_read_options(kwargs)  # for count
+        coll, filter, as_raw, lazy = cls._prepare_find(args, kwargs)
+        if count == "facet":
+            kwargs.pop("filter", None)
+            return cls.find_facet(
+                coll, filter, *args[1:], as_raw=as_raw, lazy=lazy, **kwargs
+            )
+
+        key = None
+        if as_list and cls.__cache__ is not None and cls.get_session() is None:
+            pref = repr(coll.read_preference)
+            key = cls.get_cache_key("find", args, kwargs, count, pref)
+
+        if key:
+            raw_coll = cls.get_raw_coll(coll, kwargs)
+            raws, total = cls.get_cached(
+                key,
+                lambda: (
+                    [doc.raw for doc in cls._run(raw_coll.find, *args, **kwargs)],
+                    cls.count_by(filter, count, **read),
+                ),
+            )
+            opts = coll.codec_options
+            idmap = None if as_raw else cls.get_identity_map(args, kwargs)
+            objects = [cls.from_cache(raw, opts, as_raw, lazy, idmap) for raw in raws]
+            return FacetCursor(objects, total)
+
+        coll, convert = cls.get_converter(coll, kwargs, as_raw, lazy, args)
+        cur = cls._run(coll.find, *args, **kwargs)
+        if as_list:
+            cur.objects = [convert(doc) for doc in cur] if convert else list(cur)
+
+        cur.total = cls.count_by(filter, count, **read)
+        return cur
+
+    @classmethod
+    def get_references(cls, names: Any) -> dict:
+        if isinstance(names, dict):
+            return names
+
+        refs = cls.get_class_attr("__references__", attr_type="dict")
+        return {
+            name: refs[name] for name in ([names] if isinstance(names, str) else names)
+        }
+
+    @classmethod
+    def find_related(cls, related: Any, *args: Any, **kwargs: Any) -> Any:
+        """find() with references prefetched (prefetch=/with_related=)
+
+        joined by one $lookup if limit <= __lookup_limit__ (one round trip),
+        otherwise one $in query per reference (related docs fetched once)
+        """
+        kwargs.pop("with_related", None)
+        refs = cls.get_references(related)
+        lookup = cls._prepare_lookup(refs, args, kwargs)
+        if lookup is not None:
+            coll, pipeline, as_raw, count = lookup
+            docs = list(cls._run(coll.aggregate, pipeline))
+            objects = cls.get_lookup_objects(docs, refs, as_raw, coll.codec_options)
+            filter = args[0] if args else kwargs.get("filter")
+            read = cls.get_read_options(kwargs)
+            return FacetCursor(objects, cls.count_by(filter, count, **read))
+
+        cur = cls.find(*args, **kwargs)
+        if kwargs.get("as_list", True):
+            cls.prefetch(cur.objects, refs, kwargs.get("as_raw", False))
+
+        return cur
+
+    @classmethod
+    def _prepare_lookup(cls, refs: dict, args: tuple, kwargs: dict) -> Any:
+        """(collection, pipeline, as_raw, count) if $lookup is used"""
+        kwargs = dict(kwargs)
+        count = cls.get_count_strategy(kwargs.pop("count", cls.__count__))
+        if not kwargs.pop("as_list", True) or count == "facet" or len(args) > 2:
+            return None
+
+        coll, filter, as_raw, lazy = cls._prepare_find(args, kwargs)
+        limit = kwargs.get("limit") or 0
+        if (
+            not 0 < limit <= cls.__lookup_limit__
+            or not CACHE_KEY_ARGS.issuperset(kwargs)
+            or lazy
+            or cls.__track_changes__
+            or any(
+                ref.get_model().get_db_key() != cls.get_db_key()
+                for ref in refs.values()
+            )
+        ):
+            return None
+
+        pipeline = [{"$match": filter or {}}]
+        if kwargs.get("sort"):
+            pipeline.append({"$sort": dict(kwargs["sort"])})
+
+        if kwargs.get("skip"):
+            pipeline.append({"$skip": kwargs["skip"]})
+
+        pipeline.append({"$limit": limit})
+        projection = args[1] if len(args) > 1 else kwargs.get("projection")
+        if projection:
+            if not isinstance(projection, dict):
+                projection = {k: 1 for k in projection}
+
+            pipeline.append({"$project": projection})
+
+        for name, ref in refs.items():
+            lookup = {
+                "from": ref.get_model().__collection__,
+                "localField": ref.field,
+                "foreignField": ref.foreign_field,
+                "as": f"__related_{name}",
+            }
+            pipeline.append({"$lookup": lookup})
+
+        return coll, pipeline, as_raw, count
+
+    @classmethod
+    def get_lookup_objects(
+        cls,
+        docs: list,
+        refs: dict,
+        as_raw: bool = False,
+        codec_options: CodecOptions = DEFAULT_CODEC_OPTIONS,
+    ) -> list:
+        objects = []
+        for doc in docs:
+            related = {name: doc.pop(f"__related_{name}", []) for name in refs}
+            obj = doc if as_raw else cls.from_doc(doc, codec_options)
+            for name, ref in refs.items():
+                model = ref.get_model()
+                found = {
+                    get_field_value(item, ref.foreign_field): (
+                        item if as_raw else model.from_doc(item, codec_options)
+                    )
+                    for item in related[name]
+                }
+                set_related(obj, name, ref.get_related(obj, found))
+
+            objects.append(obj)
+
+        return objects
+
+    @classmethod
+    def prefetch(cls, objects: list, names: Any, as_raw: bool = False) -> list:
+        """set references of objects, one $in query per reference"""
+        for name, ref in cls.get_references(names).items():
+            ids = ref.get_ids(objects)
+            found = {}
+            if ids:
+                cur = ref.get_model().find(
+                    {ref.foreign_field: {"$in": ids}},
+                    count=None,
+                    keyset=False,
+                    as_raw=as_raw,
+                )
+                found = {get_field_value(o, ref.foreign_field): o for o in cur.objects}
+
+            for obj in objects:
+                set_related(obj, name, ref.get_related(obj, found))
+
+        return objects
+
+    @classmethod
+    def _prepare_find(cls, args: tuple, kwargs: dict) -> tuple:
+        """pop find options, return (collection, filter, as_raw, lazy)
+
+        onlys: fields to fetch if no projection (same as to_dict onlys)
+        """
+        onlys = kwargs.pop("onlys", None)
+        if onlys and len(args) < 2 and kwargs.get("projection") is None:
+            kwargs["projection"] = {k: 1 for k in onlys}
+
+        as_raw = kwargs.pop("as_raw", False)
+        lazy = kwargs.pop("lazy", cls.__lazy__) and not as_raw
         cls._parse_find_options(kwargs)
-        cur = cls._run(cls.get_wrapped_coll(kwargs).find, *args, **kwargs)
+        filter = args[0] if args else kwargs.get("filter")
+        return cls.get_wrapped_coll(kwargs), filter, as_raw, lazy
+
+    @classmethod
+    def get_converter(
+        cls,
+        coll: Collection,
+        kwargs: dict,
+        as_raw: bool = False,
+        lazy: bool = False,
+        args: tuple = (),
+        decoded: bool = False,
+    ) -> tuple:
+        """collection to query and function to convert its documents
+
+        decoded: documents are dicts of coll, e.g. of aggregate()
+        """
         if as_raw:
-            if as_list:
-                cur.objects = [doc for doc in cur]
+            return coll, None
+
+        def convert(doc: Any) -> Any:
+            if raw:
+                return cls.from_raw_doc(doc.raw, opts, lazy)
+
+            return cls.from_doc(doc, opts, lazy)
+
+        opts = coll.codec_options
+        raw = not decoded and (lazy or cls.__track_changes__)
+        if raw:
+            coll = cls.get_raw_coll(coll, kwargs)
 
+        idmap = cls.get_identity_map(args, kwargs)
+        if idmap is None:
+            return coll, convert
+
+        def get_obj(doc: Any) -> Any:
+            obj = idmap.get(doc["_id"])
+            if not isinstance(obj, cls):
+                obj = idmap[doc["_id"]] = convert(doc)
+
+            return obj
+
+        return coll, get_obj
+
+    @classmethod
+    def get_identity_map(cls, args: tuple = (), kwargs: dict = {}) -> Any:
+        """{_id: obj} of current app context, None if disabled
+
+        projected (partial) documents are not mapped
+        """
+        if (
+            not cls.__identity_map__
+            or (args[1:2] and args[1] is not None)
+            or kwargs.get("projection") is not None
+            or not has_app_context()
+            or cls.get_session() is not None
+        ):
+            return None
+
+        maps = g.setdefault("_mongo_identity_maps", {})
+        return maps.setdefault((cls.get_db_key(), cls.__collection__), {})
+
+    @classmethod
+    def get_loaders(cls) -> Union[dict, None]:
+        """{(dbkey, collection): {model: loader}} of current app context"""
+        return g.setdefault("_mongo_loaders", {}) if has_app_context() else None
+
+    @classmethod
+    def get_loader(cls, **kwargs: Any) -> Loader:
+        """Loader of current context, new one for find options kwargs"""
+        loaders = None if kwargs else cls.get_loaders()
+        if loaders is None:
+            return cls.__loader_class__(cls, **kwargs)
+
+        loaders = loaders.setdefault((cls.get_db_key(), cls.__collection__), {})
+        loader = loaders.get(cls)
+        if loader is None:
+            loader = loaders[cls] = cls.__loader_class__(cls)
+
+        return loader
+
+    @classmethod
+    def load(cls, id: Any) -> Any:
+        """future of object by id, queries are batched, see Loader"""
+        return cls.get_loader().load(id)
+
+    @classmethod
+    def load_many(cls, ids: Any, **kwargs: Any) -> list:
+        """objects by ids in one query, None for missing ones"""
+        return cls.get_loader(**kwargs).load_many(ids)
+
+    @classmethod
+    def get_identity(
+        cls, filter: Any, args: tuple, kwargs: dict, as_raw: bool = False
+    ) -> Any:
+        """mapped object of filter by _id only"""
+        if (
+            as_raw
+            or not isinstance(filter, dict)
+            or list(filter) != ["_id"]
+            or isinstance(filter["_id"], dict)
+        ):
+            return None
+
+        idmap = cls.get_identity_map(args, kwargs)
+        obj = None if idmap is None else idmap.get(filter["_id"])
+        return obj if isinstance(obj, cls) else None
+
+    @classmethod
+    def from_raw_doc(
+        cls, raw: bytes, codec_options: CodecOptions, lazy: bool = False
+    ) -> Any:
+        """object from raw bson, which is kept if __track_changes__"""
+        if lazy:
+            obj = cls.from_raw(raw, codec_options)
         else:
-            if as_list:
-                cur.objects = [cls(**doc) for doc in cur]
+            obj = cls(**bson.decode(raw, codec_options))
 
-        if count:
-            cur.total = cls.count_documents(kwargs.get("filter", {}))
+        if cls.__track_changes__:
+            SNAPSHOTS[obj] = raw, codec_options
 
-        return cur
+        return obj
+
+    @classmethod
+    def from_doc(
+        cls,
+        doc: dict,
+        codec_options: CodecOptions = DEFAULT_CODEC_OPTIONS,
+        lazy: bool = False,
+    ) -> Any:
+        """object from doc decoded with codec_options, see from_raw_doc()"""
+        if lazy or cls.__track_changes__:
+            return cls.from_raw_doc(bson.encode(doc), codec_options, lazy)
+
+        return cls(**doc)
 
     @classmethod
-    def iter_docs(cls, cur: CursorType, as_raw: bool = False) -> Any:
+    def from_fanout(cls, results: dict, docs: list) -> list:
+        """objects of merged docs of fanout() results {dbkey: docs}"""
+        colls = cls.get_fanout_colls(results)
+        opts = {
+            id(doc): colls[dbkey].codec_options
+            for dbkey, found in results.items()
+            for doc in found
+        }
+        return [cls.from_doc(doc, opts[id(doc)]) for doc in docs]
+
+    @classmethod
+    def iter_docs(cls, cur: CursorType, as_raw: bool = False, lazy: Any = None) -> Any:
+        opts = cur.collection.codec_options
+        if opts.document_class is RawBSONDocument and not as_raw:
+            opts = opts.with_options(document_class=dict)
+            lazy = cls.__lazy__ if lazy is None else lazy
+            for doc in cur:
+                yield cls.from_raw_doc(doc.raw, opts, lazy)
+
+            return
+
         for doc in cur:
             if as_raw:
                 yield doc
             else:
-                yield cls(**doc)
+                yield cls.from_doc(doc, opts)
+
+    @classmethod
+    def find_iter(cls, *args: Any, batch_size: int = 0, **kwargs: Any) -> Any:
+        """like find(as_list=True) but yield objects batch by batch"""
+        as_raw = kwargs.pop("as_raw", False)
+        kwargs.update(as_list=False, count=None, keyset=False)
+        if batch_size:
+            kwargs["batch_size"] = batch_size
+
+        cur = cls.find(*args, as_raw=as_raw, **kwargs)
+        lazy = kwargs.get("lazy", cls.__lazy__)
+        return FindIterator(cur, cls.iter_docs(cur, as_raw, lazy), batch_size)
+
+    @classmethod
+    def get_fanout_colls(cls, dbkeys: Any = None) -> dict:
+        """{dbkey: collection}, all registered db keys by default"""
+        dbkeys = list(cls.__dbs__) if dbkeys is None else list(dbkeys)
+        return {dbkey: cls.get_wrapped_coll({}, dbkey=dbkey) for dbkey in dbkeys}
+
+    @classmethod
+    def fanout(cls, func: Any, dbkeys: Any = None) -> dict:
+        """{dbkey: func(collection)}, run concurrently for db keys
+
+        dbkeys: all registered ones by default
+        func should run commands by _run(..., no_session=True),
+        sessions belong to the client of current db key
+        """
+        colls = cls.get_fanout_colls(dbkeys)
+        return dict(zip(colls, get_fanout_executor().map(func, colls.values())))
+
+    @classmethod
+    def find_fanout(
+        cls,
+        filter: Any = None,
+        projection: Any = None,
+        dbkeys: Any = None,
+        sort: Any = None,
+        skip: int = 0,
+        limit: int = 0,
+        count: bool = False,
+        as_raw: bool = False,
+        **kwargs: Any,
+    ) -> FacetCursor:
+        """find() on db keys concurrently, results are merged in sort order
+        and skip/limit are applied to merged results
+        """
+        sort = get_sort(sort)
+        if limit:
+            kwargs["limit"] = skip + limit  # top of every db
+
+        def find(coll: Collection) -> list:
+            return list(
+                cls._run(
+                    coll.find,
+                    filter,
+                    projection,
+                    sort=sort or None,
+                    no_session=True,
+                    **kwargs,
+                )
+            )
+
+        results = cls.fanout(find, dbkeys)
+        docs = merge_sorted(results.values(), sort, skip, limit)
+        total = cls.count_fanout(filter, dbkeys) if count else None
+        return FacetCursor(docs if as_raw else cls.from_fanout(results, docs), total)
+
+    @classmethod
+    def count_fanout(cls, filter: Any = None, dbkeys: Any = None, **kwargs) -> int:
+        def count(coll: Collection) -> int:
+            return cls._run(
+                coll.count_documents, filter or {}, no_session=True, **kwargs
+            )
+
+        return sum(cls.fanout(count, dbkeys).values())
+
+    @classmethod
+    def aggregate_fanout(
+        cls,
+        pipeline: Any,
+        dbkeys: Any = None,
+        sort: Any = None,
+        skip: int = 0,
+        limit: int = 0,
+        as_raw: bool = True,
+        **kwargs: Any,
+    ) -> list:
+        """aggregate() on db keys concurrently, results of pipeline
+        should be sorted by sort to be merged
+        """
+
+        def aggregate(coll: Collection) -> list:
+            return list(cls._run(coll.aggregate, pipeline, no_session=True, **kwargs))
+
+        results = cls.fanout(aggregate, dbkeys)
+        docs = merge_sorted(results.values(), get_sort(sort), skip, limit)
+        return docs if as_raw else cls.from_fanout(results, docs)
 
     @classmethod
     def find_raw_batches(cls, *args: Any, **kwargs: Any) -> Any:
         kwargs.pop("as_raw", None)
         cls._parse_find_options(kwargs)
-        return cls.get_wrapped_coll(kwargs).find_raw_batches(*args, **kwargs)
+        coll = cls.get_wrapped_coll(kwargs)
+        return cls._run(coll.find_raw_batches, *args, **kwargs)
+
+    @classmethod
+    def decode_batch(
+        cls,
+        batch: bytes,
+        codec_options: CodecOptions = DEFAULT_CODEC_OPTIONS,
+        as_raw: bool = False,
+    ) -> list:
+        """decode a raw batch into objects (or dicts if as_raw)"""
+        docs = bson.decode_all(batch, codec_options)
+        return docs if as_raw else [cls.from_doc(doc, codec_options) for doc in docs]
+
+    @classmethod
+    def find_batches(cls, *args: Any, **kwargs: Any) -> Any:
+        """find_raw_batches() but yield each batch as list of objects"""
+        as_raw = kwargs.pop("as_raw", False)
+        cur = cls.find_raw_batches(*args, **kwargs)
+        opts = cur.collection.codec_options
+        for batch in cur:
+            yield cls.decode_batch(batch, opts, as_raw)
 
     @classmethod
     def find_one(cls, filter: Any = None, *args: Any, **kwargs: Any) -> Any:
         if isinstance(filter, (str, ObjectId)):
             filter = dict(_id=cls.get_oid(filter))
 
-        as_raw = kwargs.pop("as_raw", False)
-        cls._parse_find_options(kwargs)
-        doc = cls._run(cls.get_wrapped_coll(kwargs).find_one, filter, *args, **kwargs)
-        return (doc if as_raw else cls(**doc)) if doc else None
+        coll, _, as_raw, lazy = cls._prepare_find((filter, *args), kwargs)
+        obj = cls.get_identity(filter, (filter, *args), kwargs, as_raw)
+        if obj is not None:
+            return obj
+
+        key = None
+        if cls.__cache__ is not None and cls.get_session() is None:
+            pref = repr(coll.read_preference)
+            key = cls.get_cache_key("find_one", (filter, *args), kwargs, pref)
+
+        if key:
+            raw_coll = cls.get_raw_coll(coll, kwargs)
+            raw = cls.get_cached(
+                key,
+                lambda: getattr(
+                    cls._run(raw_coll.find_one, filter, *args, **kwargs), "raw", b""
+                ),
+            )
+            if not raw:
+                return None
+
+            idmap = None if as_raw else cls.get_identity_map((filter, *args), kwargs)
+            return cls.from_cache(raw, coll.codec_options, as_raw, lazy, idmap)
+
+        coll, convert = cls.get_converter(coll, kwargs, as_raw, lazy, (filter, *args))
+        doc = cls._run(coll.find_one, filter, *args, **kwargs)
+        return (convert(doc) if convert else doc) if doc else None
+
+    @classmethod
+    def get_cache_key(
+        cls, action: str, args: tuple, kwargs: dict, *extras: Any
+    ) -> Union[str, None]:
+        """key of normalized query, None if the query is not cacheable"""
+        if len(args) > 2 or not CACHE_KEY_ARGS.issuperset(kwargs):
+            return None
+
+        query = dict(zip(("filter", "projection"), args), **kwargs)
+        if isinstance(query.get("filter"), dict):  # order of fields not matter
+            query["filter"] = dict(sorted(query["filter"].items()))
+
+        if isinstance(query.get("projection"), (list, tuple)):
+            query["projection"] = {k: 1 for k in query["projection"]}
+
+        try:
+            raw = bson.encode(dict(action=action, query=query, extras=extras))
+        except (InvalidDocument, TypeError):
+            return None
+
+        return (
+            f"{cls.get_db_key()}:{cls.__collection__}:{hashlib.sha1(raw).hexdigest()}"
+        )
+
+    @classmethod
+    def get_cached(cls, key: str, fetch: Any) -> Any:
+        cache = cls.__cache__
+        value = cache.get(key)
+        if value is None:
+            version = get_cache_version(cache)
+            value = fetch()
+            if get_cache_version(cache) == version:  # no writes since
+                cache.set(key, value, cls.__cache_ttl__)
+
+        return value
+
+    @classmethod
+    def from_cache(
+        cls,
+        raw: bytes,
+        codec_options: CodecOptions,
+        as_raw: bool,
+        lazy: bool,
+        idmap: Union[dict, None] = None,
+    ) -> Any:
+        if as_raw:
+            return bson.decode(raw, codec_options)
+
+        obj = cls.from_raw_doc(raw, codec_options, lazy)
+        if idmap is not None:
+            mapped = idmap.get(obj.id)
+            if isinstance(mapped, cls):
+                return mapped
+
+            idmap[obj.id] = obj
+
+        return obj
+
+    @classmethod
+    def watch_cache(cls, **kwargs: Any) -> ChangeStreamConsumer:
+        """clear query cache when collection is changed by other processes"""
+
+        def clear(change: Any = None) -> None:
+            cls.clear_cache()
+
+        clear.reset = clear
+        return cls.consume_changes(clear, **kwargs)
+
+    @classmethod
+    def consume_changes(cls, *handlers: Any, **kwargs: Any) -> ChangeStreamConsumer:
+        """start ChangeStreamConsumer of the collection with handlers"""
+        return ChangeStreamConsumer(cls, *handlers, **kwargs).start()
+
+    @classmethod
+    def materialize(
+        cls, key: str = "_id", as_raw: bool = False, **kwargs: Any
+    ) -> MaterializedView:
+        """MaterializedView of the collection by key, see it for details"""
+        view = MaterializedView(cls, key, as_raw)
+        view.consumer = cls.consume_changes(view, **kwargs)
+        return view
 
     @classmethod
     def find_one_and_delete(cls, *args: Any, **kwargs: Any) -> Any:
@@ -475,7 +2324,9 @@ class BaseModel(BaseMixin):
 
     @classmethod
     def capture_errors(cls, action: str, *args: Any, **kwargs: Any) -> Any:
-        if kwargs.pop("capture_errors", True):
+        """errors are returned as strings, raised in transaction() blocks"""
+        capture = kwargs.pop("capture_errors", True)
+        if capture and cls.get_session() is None:
             try:
                 return cls._run(action, *args, **kwargs)
             except Exception as ex:
@@ -514,19 +2365,63 @@ class BaseModel(BaseMixin):
     @classmethod
     def aggregate(cls, pipeline: Any, **kwargs) -> Any:
         docs = []
-        for doc in cls._run("aggregate", pipeline, **kwargs):
+        coll = cls.get_read_coll(kwargs)
+        for doc in cls._run(coll.aggregate, pipeline, **kwargs):
             docs.append(doc)
 
         return docs
 
+    @classmethod
+    def aggregate_iter(
+        cls,
+        pipeline: Any,
+        as_raw: bool = True,
+        batch_size: int = 0,
+        allow_disk_use: Union[bool, None] = None,
+        **kwargs: Any,
+    ) -> FindIterator:
+        """like aggregate() but yield docs batch by batch
+
+        as_raw=False: convert docs to objects
+        """
+        if batch_size:
+            kwargs["batchSize"] = batch_size
+
+        if allow_disk_use is not None:
+            kwargs["allowDiskUse"] = allow_disk_use
+
+        coll = cls.get_wrapped_coll(kwargs)
+        cur = cls._run(coll.aggregate, pipeline, **kwargs)
+        opts = coll.codec_options
+        docs = cur if as_raw else (cls.from_doc(doc, opts) for doc in cur)
+        return FindIterator(cur, docs, batch_size)
+
+    @classmethod
+    def aggregate_response(cls, pipeline: Any, **kwargs: Any) -> Response:
+        """stream aggregate_iter() as NDJSON response"""
+        json_options = kwargs.pop("json_options", RELAXED_JSON_OPTIONS)
+        return ndjson_response(cls.aggregate_iter(pipeline, **kwargs), json_options)
+
     @classmethod
     def aggregate_raw_batches(cls, pipeline: Any, **kwargs) -> Any:
-        return cls._run("aggregate_raw_batches", pipeline, **kwargs)
+        coll = cls.get_read_coll(kwargs)
+        return cls._run(coll.aggregate_raw_batches, pipeline, **kwargs)
 
     @classmethod
     def bulk_write(cls, requests: Any, **kwargs) -> Any:
         return cls.capture_errors("bulk_write", requests, **kwargs)
 
+    @classmethod
+    def get_bulk_writer(cls, **kwargs: Any) -> BulkWriter:
+        """write-behind buffer of the model (see BulkWriter)"""
+        writer = cls.__dict__.get("__bulk_writer__")
+        if writer is None:
+            kwargs.setdefault("max_size", cls.__bulk_size__)
+            kwargs.setdefault("max_delay", cls.__bulk_delay__)
+            writer = cls.__bulk_writer__ = BulkWriter(cls, **kwargs)
+
+        return writer
+
     @classmethod
     def create_index(cls, keys: Any, **kwargs) -> Any:
         keys = get_sort(keys, for_index=True)
@@ -553,11 +2448,18 @@ class BaseModel(BaseMixin):
 
     @classmethod
     def count_documents(cls, *args: Any, **kwargs: Any) -> Any:
-        return cls._run("count_documents", *args, **kwargs)
+        coll = cls.get_read_coll(kwargs)
+        return cls._run(coll.count_documents, *args, **kwargs)
+
+    @classmethod
+    def estimated_document_count(cls, **kwargs: Any) -> Any:
+        coll = cls.get_read_coll(kwargs)
+        return cls._run(coll.estimated_document_count, **kwargs)
 
     @classmethod
     def distinct(cls, key, *args: Any, **kwargs: Any) -> Any:
-        return cls._run("distinct", key, *args, **kwargs)
+        coll = cls.get_read_coll(kwargs)
+        return cls._run(coll.distinct, key, *args, **kwargs)
 
     @classmethod
     def drop(cls, *args: Any, **kwargs: Any) -> Any:
@@ -601,7 +2503,9 @@ class BaseModel(BaseMixin):
 
     @classmethod
     def watch(cls, *args: Any, **kwargs: Any) -> Any:
-        return cls._run("watch", *args, **kwargs)
+        """change stream of collection, documents are decoded like find()"""
+        coll = cls.get_wrapped_coll(kwargs)
+        return cls._run(coll.watch, *args, **kwargs)
 
     @classmethod
     def run_for(cls, action, *args: Any, **kwargs: Any) -> Any:
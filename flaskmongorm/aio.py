@@ -0,0 +1,722 @@
+#!/usr/bin/env python3
+# -*- coding=utf-8 -*-
+
+import asyncio
+import contextlib
+import contextvars
+import inspect
+import time
+import weakref
+from typing import Any, Union
+
+try:
+    from pymongo import AsyncMongoClient
+except ImportError:  # pymongo < 4.10
+    from motor.motor_asyncio import AsyncIOMotorClient as AsyncMongoClient
+
+from bson.objectid import ObjectId
+from bson.raw_bson import RawBSONDocument
+from flask import has_app_context
+from pymongo.errors import PyMongoError
+
+from . import (
+    CACHE_WRITE_ACTIONS,
+    SNAPSHOTS,
+    TRANSACTION_TIMEOUT,
+    TRANSACTION_WRITES,
+    BaseModel,
+    FacetCursor,
+    Loader,
+    PoolMetrics,
+    clear_transaction_caches,
+    get_cache_version,
+    get_field_value,
+    get_pool_options,
+    get_sort,
+    merge_sorted,
+    set_related,
+)
+
+# session of current Model.transaction() block
+current_session = contextvars.ContextVar("flaskmongorm_session", default=None)
+# loaders of current loader_scope() block
+current_loaders = contextvars.ContextVar("flaskmongorm_loaders", default=None)
+# {loop: loaders} out of scopes and app contexts, dropped after the loop tick
+TICK_LOADERS = weakref.WeakKeyDictionary()
+
+
+async def maybe_await(value: Any) -> Any:
+    """motor and pymongo async api return cursors directly, others await"""
+    if inspect.isawaitable(value):
+        return await value
+
+    return value
+
+
+class AsyncFindIterator:
+    """async version of FindIterator"""
+
+    def __init__(self, cursor: Any, objects: Any, batch_size: int = 0) -> None:
+        self.cursor = cursor
+        self.objects = objects
+        self.batch_size = batch_size
+        self.count = 0
+
+    async def __aiter__(self) -> Any:
+        try:
+            async for obj in self.objects:
+                self.count += 1
+                yield obj
+        finally:
+            await self.close()
+
+    async def iter_batches(self, batch_size: int = 0) -> Any:
+        """yield lists of objects"""
+        size = batch_size or self.batch_size or 100
+        batch = []
+        async for obj in self:
+            batch.append(obj)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
+    async def close(self) -> None:
+        await maybe_await(self.cursor.close())
+
+    async def __aenter__(self) -> "AsyncFindIterator":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+
+@contextlib.contextmanager
+def loader_scope() -> Any:
+    """keep loaded objects of the block (e.g. a task or job) out of app contexts
+
+    with loader_scope():
+        customers = await asyncio.gather(*[Customer.load(id) for id in ids])
+    """
+    token = current_loaders.set({})
+    try:
+        yield
+    finally:
+        current_loaders.reset(token)
+
+
+class AsyncLoader(Loader):
+    """load(id) calls of one event loop tick are sent in one query
+
+    customers = await asyncio.gather(*[Customer.load(id) for id in ids])
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.tasks = set()  # running dispatches, not garbage collected
+
+    def new_future(self) -> asyncio.Future:
+        return asyncio.get_running_loop().create_future()
+
+    def load(self, id: Any) -> asyncio.Future:
+        pending = bool(self.pending)
+        future = self.add(id)
+        if self.pending and not pending:
+            asyncio.get_running_loop().call_soon(self.start_dispatch)
+
+        return future
+
+    def start_dispatch(self) -> None:
+        task = asyncio.get_running_loop().create_task(self.dispatch())
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def load_many(self, ids: Any) -> list:
+        return list(await asyncio.gather(*[self.load(id) for id in ids]))
+
+    async def dispatch(self) -> None:
+        for keys in self.take_batches():
+            try:
+                cur = await self.model.find(
+                    {"_id": {"$in": keys}}, count=None, keyset=False, **self.kwargs
+                )
+            except Exception as ex:
+                self.set_exception(keys, ex)
+            else:
+                self.set_results(keys, cur.objects)
+
+
+class AsyncBaseModel(BaseModel):
+    """BaseModel on asyncio, every database method is awaitable
+
+    AsyncBaseModel.init_app(app)
+    user = await User.find_one(id)
+    async for user in await User.find_iter(): ...
+    async with User.transaction(): ...
+    """
+
+    # not shared with sync models
+    __clients__ = {}
+    __dbs__ = {}
+    __dbkeys__ = {}
+    __wrapped_colls__ = {}
+    __pool_metrics__ = {}
+    __loader_class__ = AsyncLoader
+
+    @classmethod
+    def init_app(
+        cls,
+        app: Any,
+        *args: Any,
+        uri: Union[str, None] = None,
+        dbname: Union[str, None] = None,
+        dbkey: Union[str, None] = None,
+        **kwargs: Any,
+    ) -> None:
+        kwargs.setdefault("tz_aware", True)
+        for option, value in get_pool_options(app.config, dbkey or dbname).items():
+            kwargs.setdefault(option, value)
+
+        metrics = PoolMetrics()
+        kwargs["event_listeners"] = [*kwargs.get("event_listeners", []), metrics]
+        client = AsyncMongoClient(uri or app.config["MONGO_URI"], *args, **kwargs)
+        db = client.get_default_database(dbname)
+        if not dbkey:
+            dbkey = db.name
+
+        cls.__dbkeys__[db.name] = dbkey
+        cls.__clients__[dbkey] = client
+        cls.__dbs__[dbkey] = db
+        cls.__wrapped_colls__.pop(dbkey, None)
+        cls.__pool_metrics__[dbkey] = metrics
+
+    @classmethod
+    @contextlib.asynccontextmanager
+    async def transaction(cls, **kwargs: Any) -> Any:
+        """run all operations of the block in one transaction
+
+        commit once at the end (retried on UnknownTransactionCommitResult),
+        nested blocks join the outer transaction.
+        use run_in_transaction() to retry on TransientTransactionError.
+        """
+        session = current_session.get()
+        if session is not None:
+            yield session
+            return
+
+        session = await maybe_await(cls.get_client().start_session())
+        async with session:
+            await maybe_await(session.start_transaction(**kwargs))
+            token = current_session.set(session)
+            try:
+                yield session
+            except BaseException:
+                if session.in_transaction:
+                    await maybe_await(session.abort_transaction())
+
+                raise
+            else:
+                await cls.commit_transaction(session)
+                clear_transaction_caches(session)
+            finally:
+                current_session.reset(token)
+                TRANSACTION_WRITES.pop(session, None)
+
+    @classmethod
+    async def commit_transaction(cls, session: Any) -> None:
+        deadline = time.monotonic() + TRANSACTION_TIMEOUT
+        while True:
+            try:
+                return await maybe_await(session.commit_transaction())
+            except PyMongoError as ex:
+                if (
+                    ex.has_error_label("UnknownTransactionCommitResult")
+                    and time.monotonic() < deadline
+                ):
+                    continue
+
+                raise
+
+    @classmethod
+    async def run_in_transaction(cls, func: Any, *args: Any, **kwargs: Any) -> Any:
+        """await func in transaction(), retry on TransientTransactionError"""
+        deadline = time.monotonic() + TRANSACTION_TIMEOUT
+        while True:
+            try:
+                async with cls.transaction():
+                    return await func(*args, **kwargs)
+            except PyMongoError as ex:
+                if (
+                    ex.has_error_label("TransientTransactionError")
+                    and time.monotonic() < deadline
+                    and cls.get_session() is None  # not nested
+                ):
+                    continue
+
+                raise
+
+    @classmethod
+    async def load_many(cls, ids: Any, **kwargs: Any) -> list:
+        return await cls.get_loader(**kwargs).load_many(ids)
+
+    @classmethod
+    def get_session(cls) -> Any:
+        return current_session.get()
+
+    @classmethod
+    def get_loaders(cls) -> Union[dict, None]:
+        """loaders of loader_scope(), app context, or current loop tick"""
+        loaders = current_loaders.get()
+        if loaders is not None:
+            return loaders
+
+        if has_app_context():
+            return super().get_loaders()
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+
+        loaders = TICK_LOADERS.get(loop)
+        if loaders is None:  # batched, but not kept
+            loaders = TICK_LOADERS[loop] = {}
+            loop.call_soon(TICK_LOADERS.pop, loop, None)
+
+        return loaders
+
+    @classmethod
+    async def with_session(cls, action: Any, *args: Any, **kwargs: Any) -> Any:
+        if isinstance(action, str):
+            func = getattr(cls.get_collection(), action)
+        else:
+            func = action
+
+        if kwargs.pop("no_session", None) is not True:
+            session = current_session.get()
+            if session is not None:
+                kwargs.setdefault("session", session)
+            elif cls.__use_transaction__ and cls.__support_transaction__:
+                async with cls.transaction() as session:
+                    kwargs.setdefault("session", session)
+                    return await maybe_await(func(*args, **kwargs))
+
+        return await maybe_await(func(*args, **kwargs))
+
+    @classmethod
+    async def _run(cls, action: str, *args: Any, **kwargs: Any) -> Any:
+        metrics = cls.__command_metrics__
+        if metrics is None:
+            result = await cls.with_session(action, *args, **kwargs)
+        else:
+            start = time.perf_counter()
+            try:
+                result = await cls.with_session(action, *args, **kwargs)
+            except Exception as ex:
+                metrics.record(cls, action, time.perf_counter() - start, error=ex)
+                raise
+
+            result = metrics.measure(cls, action, start, result)
+
+        if getattr(action, "__name__", action) in CACHE_WRITE_ACTIONS:
+            cls._after_write()
+
+        return result
+
+    @classmethod
+    async def capture_errors(cls, action: str, *args: Any, **kwargs: Any) -> Any:
+        capture = kwargs.pop("capture_errors", True)
+        if capture and cls.get_session() is None:
+            try:
+                return await cls._run(action, *args, **kwargs)
+            except Exception as ex:
+                return f"{ex}"
+
+        return await cls._run(action, *args, **kwargs)
+
+    async def save(self, *args: Any, **kwargs: Any) -> Any:
+        if self.id and not args and self in SNAPSHOTS:
+            update = self.get_changes()
+            if not update:
+                return None
+
+            result = await self.__class__.update_one(
+                dict(_id=self.id), update, **kwargs
+            )
+            if not isinstance(result, str):  # not error
+                self.reset_changes()
+
+            return result
+
+        return await super().save(*args, **kwargs)
+
+    @classmethod
+    async def is_unique(
+        cls,
+        fields: list = [],
+        doc: dict = {},
+        id: Any = None,
+        dbdoc: dict = {},
+        *args: Any,
+        **kwargs: Any,
+    ) -> bool:
+        spec = cls.get_uniq_spec(fields, doc)
+        if spec:
+            if id:
+                spec["_id"] = {"$ne": id}
+
+            kwargs.setdefault("as_raw", True)
+            found_doc = await cls.find_one(spec, *args, **kwargs)
+            if found_doc:
+                dbdoc.update(found_doc)
+                return False
+
+        return True
+
+    @classmethod
+    async def count_by(cls, *args: Any, **kwargs: Any) -> Union[int, None]:
+        return await maybe_await(super().count_by(*args, **kwargs))
+
+    @classmethod
+    async def get_cached(cls, key: str, fetch: Any) -> Any:
+        cache = cls.__cache__
+        value = await maybe_await(cache.get(key))
+        if value is None:
+            version = get_cache_version(cache)
+            value = await fetch()
+            if get_cache_version(cache) == version:
+                await maybe_await(cache.set(key, value, cls.__cache_ttl__))
+
+        return value
+
+    @classmethod
+    async def find_facet(
+        cls, coll: Any, filter: Any = None, *args: Any, **kwargs: Any
+    ) -> FacetCursor:
+        as_raw = kwargs.pop("as_raw", False)
+        lazy = kwargs.pop("lazy", False)
+        _, convert = cls.get_converter(
+            coll, kwargs, as_raw, lazy, (filter, *args), decoded=True
+        )
+        pipeline = cls.get_facet_pipeline(filter, *args, **kwargs)
+        result = {}
+        cur = await cls._run(coll.aggregate, pipeline)
+        try:
+            async for result in cur:
+                break
+        finally:
+            await cur.close()
+
+        return cls.get_facet_cursor(result, convert)
+
+    @classmethod
+    async def find_keyset(cls, *args: Any, **kwargs: Any) -> Any:
+        keyset = cls._parse_keyset_options(args, kwargs)
+        cur = await cls.find(keyset["spec"], *args[1:], **kwargs)
+        cls._set_keyset_cursors(cur, keyset)
+        read = cls.get_read_options(kwargs)
+        cur.total = await cls.count_by(keyset["filter"], keyset["count"], **read)
+        return cur
+
+    @classmethod
+    async def find(cls, *args: Any, **kwargs: Any) -> Any:
+        if kwargs.pop("keyset", cls.__keyset__):
+            return await cls.find_keyset(*args, **kwargs)
+
+        related = kwargs.pop("prefetch", None) or kwargs.pop("with_related", None)
+        if related:
+            return await cls.find_related(related, *args, **kwargs)
+
+        count = cls.get_count_strategy(kwargs.pop("count", cls.__count__))
+        as_list = kwargs.pop("as_list", True)
+        read = cls.get_read_options(kwargs)
+        coll, filter, as_raw, lazy = cls._prepare_find(args, kwargs)
+        if count == "facet":
+            kwargs.pop("filter", None)
+            return await cls.find_facet(
+                coll, filter, *args[1:], as_raw=as_raw, lazy=lazy, **kwargs
+            )
+
+        key = None
+        if as_list and cls.__cache__ is not None and cls.get_session() is None:
+            pref = repr(coll.read_preference)
+            key = cls.get_cache_key("find", args, kwargs, count, pref)
+
+        if key:
+            raw_coll = cls.get_raw_coll(coll, kwargs)
+
+            async def fetch() -> tuple:
+                cur = await cls._run(raw_coll.find, *args, **kwargs)
+                raws = [doc.raw async for doc in cur]
+                return raws, await cls.count_by(filter, count, **read)
+
+            raws, total = await cls.get_cached(key, fetch)
+            opts = coll.codec_options
+            idmap = None if as_raw else cls.get_identity_map(args, kwargs)
+            objects = [cls.from_cache(raw, opts, as_raw, lazy, idmap) for raw in raws]
+            return FacetCursor(objects, total)
+
+        coll, convert = cls.get_converter(coll, kwargs, as_raw, lazy, args)
+        cur = await cls._run(coll.find, *args, **kwargs)
+        if as_list:
+            if convert:
+                cur.objects = [convert(doc) async for doc in cur]
+            else:
+                cur.objects = [doc async for doc in cur]
+
+        cur.total = await cls.count_by(filter, count, **read)
+        return cur
+
+    @classmethod
+    async def find_related(cls, related: Any, *args: Any, **kwargs: Any) -> Any:
+        kwargs.pop("with_related", None)
+        refs = cls.get_references(related)
+        lookup = cls._prepare_lookup(refs, args, kwargs)
+        if lookup is not None:
+            coll, pipeline, as_raw, count = lookup
+            docs = [doc async for doc in await cls._run(coll.aggregate, pipeline)]
+            objects = cls.get_lookup_objects(docs, refs, as_raw, coll.codec_options)
+            filter = args[0] if args else kwargs.get("filter")
+            read = cls.get_read_options(kwargs)
+            return FacetCursor(objects, await cls.count_by(filter, count, **read))
+
+        cur = await cls.find(*args, **kwargs)
+        if kwargs.get("as_list", True):
+            await cls.prefetch(cur.objects, refs, kwargs.get("as_raw", False))
+
+        return cur
+
+    @classmethod
+    async def prefetch(cls, objects: list, names: Any, as_raw: bool = False) -> list:
+        for name, ref in cls.get_references(names).items():
+            ids = ref.get_ids(objects)
+            found = {}
+            if ids:
+                cur = await ref.get_model().find(
+                    {ref.foreign_field: {"$in": ids}},
+                    count=None,
+                    keyset=False,
+                    as_raw=as_raw,
+                )
+                found = {get_field_value(o, ref.foreign_field): o for o in cur.objects}
+
+            for obj in objects:
+                set_related(obj, name, ref.get_related(obj, found))
+
+        return objects
+
+    @classmethod
+    async def iter_docs(cls, cur: Any, as_raw: bool = False, lazy: Any = None) -> Any:
+        opts = cur.collection.codec_options
+        if opts.document_class is RawBSONDocument and not as_raw:
+            opts = opts.with_options(document_class=dict)
+            lazy = cls.__lazy__ if lazy is None else lazy
+            async for doc in cur:
+                yield cls.from_raw_doc(doc.raw, opts, lazy)
+
+            return
+
+        async for doc in cur:
+            yield doc if as_raw else cls.from_doc(doc, opts)
+
+    @classmethod
+    async def find_iter(
+        cls, *args: Any, batch_size: int = 0, **kwargs: Any
+    ) -> AsyncFindIterator:
+        as_raw = kwargs.pop("as_raw", False)
+        kwargs.update(as_list=False, count=None, keyset=False)
+        if batch_size:
+            kwargs["batch_size"] = batch_size
+
+        cur = await cls.find(*args, as_raw=as_raw, **kwargs)
+        lazy = kwargs.get("lazy", cls.__lazy__)
+        iterator = cls.iter_docs(cur, as_raw, lazy)
+        return AsyncFindIterator(cur, iterator, batch_size)
+
+    @classmethod
+    async def find_raw_batches(cls, *args: Any, **kwargs: Any) -> Any:
+        kwargs.pop("as_raw", None)
+        cls._parse_find_options(kwargs)
+        coll = cls.get_wrapped_coll(kwargs)
+        return await cls._run(coll.find_raw_batches, *args, **kwargs)
+
+    @classmethod
+    async def find_batches(cls, *args: Any, **kwargs: Any) -> Any:
+        as_raw = kwargs.pop("as_raw", False)
+        cur = await cls.find_raw_batches(*args, **kwargs)
+        opts = cur.collection.codec_options
+        async for batch in cur:
+            yield cls.decode_batch(batch, opts, as_raw)
+
+    @classmethod
+    async def find_one(cls, filter: Any = None, *args: Any, **kwargs: Any) -> Any:
+        if isinstance(filter, (str, ObjectId)):
+            filter = dict(_id=cls.get_oid(filter))
+
+        coll, _, as_raw, lazy = cls._prepare_find((filter, *args), kwargs)
+        obj = cls.get_identity(filter, (filter, *args), kwargs, as_raw)
+        if obj is not None:
+            return obj
+
+        key = None
+        if cls.__cache__ is not None and cls.get_session() is None:
+            pref = repr(coll.read_preference)
+            key = cls.get_cache_key("find_one", (filter, *args), kwargs, pref)
+
+        if key:
+            raw_coll = cls.get_raw_coll(coll, kwargs)
+
+            async def fetch() -> bytes:
+                doc = await cls._run(raw_coll.find_one, filter, *args, **kwargs)
+                return doc.raw if doc else b""
+
+            raw = await cls.get_cached(key, fetch)
+            if not raw:
+                return None
+
+            idmap = None if as_raw else cls.get_identity_map((filter, *args), kwargs)
+            return cls.from_cache(raw, coll.codec_options, as_raw, lazy, idmap)
+
+        coll, convert = cls.get_converter(coll, kwargs, as_raw, lazy, (filter, *args))
+        doc = await cls._run(coll.find_one, filter, *args, **kwargs)
+        return (convert(doc) if convert else doc) if doc else None
+
+    @classmethod
+    async def aggregate(cls, pipeline: Any, **kwargs: Any) -> list:
+        coll = cls.get_read_coll(kwargs)
+        return [doc async for doc in await cls._run(coll.aggregate, pipeline, **kwargs)]
+
+    @classmethod
+    async def aggregate_iter(
+        cls,
+        pipeline: Any,
+        as_raw: bool = True,
+        batch_size: int = 0,
+        allow_disk_use: Union[bool, None] = None,
+        **kwargs: Any,
+    ) -> AsyncFindIterator:
+        if batch_size:
+            kwargs["batchSize"] = batch_size
+
+        if allow_disk_use is not None:
+            kwargs["allowDiskUse"] = allow_disk_use
+
+        coll = cls.get_wrapped_coll(kwargs)
+        cur = await cls._run(coll.aggregate, pipeline, **kwargs)
+
+        async def convert() -> Any:
+            async for doc in cur:
+                yield cls.from_doc(doc, coll.codec_options)
+
+        return AsyncFindIterator(cur, cur if as_raw else convert(), batch_size)
+
+    @classmethod
+    def aggregate_response(cls, pipeline: Any, **kwargs: Any) -> Any:
+        raise TypeError("aggregate_response() is not supported by async models")
+
+    @classmethod
+    def get_bulk_writer(cls, **kwargs: Any) -> Any:
+        raise TypeError("BulkWriter is not supported by async models")
+
+    @classmethod
+    def consume_changes(cls, *handlers: Any, **kwargs: Any) -> Any:
+        raise TypeError("ChangeStreamConsumer is not supported by async models")
+
+    @classmethod
+    def watch_cache(cls, **kwargs: Any) -> Any:
+        raise TypeError("watch_cache() is not supported by async models")
+
+    @classmethod
+    def materialize(cls, *args: Any, **kwargs: Any) -> Any:
+        raise TypeError("MaterializedView is not supported by async models")
+
+    @classmethod
+    async def fanout(cls, func: Any, dbkeys: Any = None) -> dict:
+        """{dbkey: await func(collection)}, run concurrently for db keys"""
+        colls = cls.get_fanout_colls(dbkeys)
+        results = await asyncio.gather(*(func(coll) for coll in colls.values()))
+        return dict(zip(colls, results))
+
+    @classmethod
+    async def find_fanout(
+        cls,
+        filter: Any = None,
+        projection: Any = None,
+        dbkeys: Any = None,
+        sort: Any = None,
+        skip: int = 0,
+        limit: int = 0,
+        count: bool = False,
+        as_raw: bool = False,
+        **kwargs: Any,
+    ) -> FacetCursor:
+        sort = get_sort(sort)
+        if limit:
+            kwargs["limit"] = skip + limit  # top of every db
+
+        async def find(coll: Any) -> list:
+            cur = await cls._run(
+                coll.find,
+                filter,
+                projection,
+                sort=sort or None,
+                no_session=True,
+                **kwargs,
+            )
+            return [doc async for doc in cur]
+
+        results = await cls.fanout(find, dbkeys)
+        docs = merge_sorted(results.values(), sort, skip, limit)
+        total = await cls.count_fanout(filter, dbkeys) if count else None
+        return FacetCursor(docs if as_raw else cls.from_fanout(results, docs), total)
+
+    @classmethod
+    async def count_fanout(
+        cls, filter: Any = None, dbkeys: Any = None, **kwargs: Any
+    ) -> int:
+        async def count(coll: Any) -> int:
+            return await cls._run(
+                coll.count_documents, filter or {}, no_session=True, **kwargs
+            )
+
+        return sum((await cls.fanout(count, dbkeys)).values())
+
+    @classmethod
+    async def aggregate_fanout(
+        cls,
+        pipeline: Any,
+        dbkeys: Any = None,
+        sort: Any = None,
+        skip: int = 0,
+        limit: int = 0,
+        as_raw: bool = True,
+        **kwargs: Any,
+    ) -> list:
+        async def aggregate(coll: Any) -> list:
+            cur = await cls._run(coll.aggregate, pipeline, no_session=True, **kwargs)
+            return [doc async for doc in cur]
+
+        results = await cls.fanout(aggregate, dbkeys)
+        docs = merge_sorted(results.values(), get_sort(sort), skip, limit)
+        return docs if as_raw else cls.from_fanout(results, docs)
+
+    @classmethod
+    async def create_index(cls, keys: Any, **kwargs: Any) -> Any:
+        keys = get_sort(keys, for_index=True)
+        if cls.__background_index__ is not None:
+            kwargs.setdefault("background", cls.__background_index__)
+
+        func = cls.get_collection().create_index
+        if keys and isinstance(keys, list):
+            if isinstance(keys[0], list):  # [[(...), (...)], [(...)]]
+                for key in keys:
+                    await cls._run(func, key, **kwargs)
+
+            else:  # [(), ()]
+                await cls._run(func, keys, **kwargs)
+
+    @classmethod
+    async def create_indexes(cls, *args: Any, **kwargs: Any) -> Any:
+        return await maybe_await(super().create_indexes(*args, **kwargs))
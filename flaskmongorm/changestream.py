@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding=utf-8 -*-
+
+import threading
+import time
+from typing import Any, Union
+
+from flask import current_app, has_app_context
+from flask_pymongo.wrappers import Collection
+
+from .utils import get_field_value
+
+# InvalidResumeToken, ChangeStreamFatalError, ChangeStreamHistoryLost
+CHANGE_STREAM_RESTART_CODES = frozenset((260, 280, 286))
+
+
+class ChangeStreamConsumer:
+    """background thread feeding change events of model to handlers
+
+    a handler is called with each change document; its reset() (if any)
+    is called when the stream (re)starts without full history: first start
+    in this process, or when the resume token is lost.
+    with name (unique per consumer, e.g. "<service>:<collection>"), resume
+    token is saved to __resume_tokens__ collection, at most every
+    save_delay seconds, so handlers continue after restarts; without it
+    the token is kept in memory (handlers with per-process state).
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        *handlers: Any,
+        name: Union[str, None] = None,
+        pipeline: Union[list, None] = None,
+        save_delay: float = 1.0,
+        **kwargs: Any,
+    ) -> None:
+        self.model = model
+        self.handlers = list(handlers)
+        self.name = name
+        self.pipeline = pipeline or []
+        self.save_delay = save_delay
+        kwargs.setdefault("full_document", "updateLookup")
+        kwargs.setdefault("max_await_time_ms", 1000)  # poll interval
+        self.kwargs = kwargs
+        self.stopped = threading.Event()
+        self.thread = None
+        self.app = None
+        self.synced_at = None  # monotonic time of last successful poll
+        self.error = None  # last exception of stream or handlers
+
+    def add_handler(self, handler: Any) -> Any:
+        self.handlers.append(handler)
+        return handler
+
+    def get_token_coll(self) -> Collection:
+        return self.model.get_db()[self.model.__resume_tokens__]
+
+    def load_token(self) -> Any:
+        if self.name is None:
+            return None
+
+        doc = self.get_token_coll().find_one(dict(_id=self.name))
+        return doc["token"] if doc else None
+
+    def save_token(self, token: Any) -> None:
+        if self.name is None:
+            return
+
+        self.get_token_coll().replace_one(
+            dict(_id=self.name), dict(_id=self.name, token=token), upsert=True
+        )
+
+    def is_fresh(self, max_staleness: float) -> bool:
+        """all changes older than max_staleness seconds are handled"""
+        synced_at = self.synced_at
+        return synced_at is not None and time.monotonic() - synced_at <= max_staleness
+
+    def start(self) -> "ChangeStreamConsumer":
+        if self.thread is None or not self.thread.is_alive():
+            self.app = current_app._get_current_object() if has_app_context() else None
+            self.stopped.clear()
+            self.thread = threading.Thread(target=self.run_in_app, daemon=True)
+            self.thread.start()
+
+        return self
+
+    def stop(self, timeout: Union[float, None] = None) -> None:
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def run_in_app(self) -> None:
+        if self.app is None:
+            self.run()
+        else:
+            with self.app.app_context():
+                self.run()
+
+    def reset(self) -> None:
+        for handler in self.handlers:
+            if hasattr(handler, "reset"):
+                handler.reset()
+
+    def handle(self, change: dict) -> None:
+        for handler in self.handlers:
+            try:
+                handler(change)
+            except Exception as ex:
+                self.error = ex
+
+    def run(self) -> None:
+        token, reset, delay, loaded = None, True, 0.1, False
+        while not self.stopped.is_set():
+            try:
+                if not loaded:
+                    token, loaded = self.load_token(), True
+
+                kwargs = dict(self.kwargs)
+                if token is not None:
+                    kwargs["resume_after"] = token
+
+                with self.model.watch(self.pipeline, **kwargs) as stream:
+                    if reset:
+                        self.reset()
+                        reset = False
+
+                    saved_at = time.monotonic()
+                    while stream.alive and not self.stopped.is_set():
+                        change = stream.try_next()
+                        self.synced_at = now = time.monotonic()
+                        if change is not None:
+                            self.handle(change)
+                            if change["operationType"] == "invalidate":
+                                token, reset = None, True
+                                break
+
+                        token = stream.resume_token
+                        if token is not None and now - saved_at >= self.save_delay:
+                            self.save_token(token)
+                            saved_at = now
+
+                    delay = 0.1
+
+                if token is not None:
+                    self.save_token(token)
+            except Exception as ex:  # reset() and tokens are retried too
+                self.synced_at = None
+                self.error = ex
+                if getattr(ex, "code", None) in CHANGE_STREAM_RESTART_CODES:
+                    token, reset = None, True
+
+                self.stopped.wait(delay)
+                delay = min(delay * 2, 30)
+
+
+class MaterializedView:
+    """in-memory docs of model by _id or an unique field
+
+    view = User.materialize("email")
+    user = view.get("a@b.c", max_staleness=5)
+
+    loaded by reset() and kept up to date by change events, lookups are
+    served from memory unless the consumer is behind more than
+    max_staleness seconds, then from database.
+    objects are shared between readers, don't change them.
+    """
+
+    def __init__(
+        self, model: Any, key: str = "_id", as_raw: bool = False, consumer: Any = None
+    ) -> None:
+        self.model = model
+        self.key = key
+        self.as_raw = as_raw
+        self.consumer = consumer
+        self.docs = {}  # {key: obj}
+        self.keys = {}  # {_id: key}, deletes only have _id
+        self.lock = threading.Lock()
+
+    def to_object(self, doc: dict) -> Any:
+        if self.as_raw:
+            return doc
+
+        opts = self.model.get_wrapped_coll({}).codec_options
+        return self.model.from_doc(doc, opts)
+
+    def reset(self) -> None:
+        docs, keys = {}, {}
+        for doc in self.model.find_iter(as_raw=True):
+            value = get_field_value(doc, self.key)
+            if value is not None:
+                docs[value] = self.to_object(doc)
+                keys[doc["_id"]] = value
+
+        with self.lock:
+            self.docs, self.keys = docs, keys
+
+    def __call__(self, change: dict) -> None:
+        op = change["operationType"]
+        if op in ("insert", "update", "replace"):
+            doc = change.get("fullDocument")
+            if doc is None:  # deleted before lookup
+                self.remove(change["documentKey"]["_id"])
+            else:
+                self.put(doc)
+        elif op == "delete":
+            self.remove(change["documentKey"]["_id"])
+        elif op in ("drop", "dropDatabase", "rename"):
+            with self.lock:
+                self.docs, self.keys = {}, {}
+
+    def put(self, doc: dict) -> None:
+        value = get_field_value(doc, self.key)
+        with self.lock:
+            old = self.keys.pop(doc["_id"], None)
+            if old is not None:
+                self.docs.pop(old, None)
+
+            if value is not None:
+                self.docs[value] = self.to_object(doc)
+                self.keys[doc["_id"]] = value
+
+    def remove(self, id: Any) -> None:
+        with self.lock:
+            value = self.keys.pop(id, None)
+            if value is not None:
+                self.docs.pop(value, None)
+
+    def get(
+        self, value: Any, default: Any = None, max_staleness: Union[float, None] = None
+    ) -> Any:
+        if max_staleness is not None and not (
+            self.consumer and self.consumer.is_fresh(max_staleness)
+        ):
+            doc = self.model.find_one({self.key: value}, as_raw=self.as_raw)
+            return default if doc is None else doc
+
+        return self.docs.get(value, default)
+
+    def __getitem__(self, value: Any) -> Any:
+        return self.docs[value]
+
+    def __contains__(self, value: Any) -> bool:
+        return value in self.docs
+
+    def __len__(self) -> int:
+        return len(self.docs)
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding=utf-8 -*-
+
+import bisect
+import functools
+import inspect
+import logging
+import threading
+import time
+from collections.abc import Mapping
+from typing import Any, Union
+
+from flask import Response
+
+# collection methods returning cursors, recorded when consumed (MeteredCursor)
+CURSOR_ACTIONS = frozenset(
+    ("find", "aggregate", "find_raw_batches", "aggregate_raw_batches")
+)
+logger = logging.getLogger(__name__)
+
+
+def get_doc_count(result: Any) -> int:
+    """number of documents returned or affected by a command result"""
+    if result is None:
+        return 0
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, Mapping):  # find_one
+        return 1
+    if hasattr(result, "inserted_ids"):
+        return len(result.inserted_ids)
+    if hasattr(result, "inserted_id"):
+        return 1
+    if hasattr(result, "deleted_count") and not hasattr(result, "modified_count"):
+        return result.deleted_count
+    if hasattr(result, "bulk_api_result"):
+        counts = result.bulk_api_result
+        return sum(counts.get(k, 0) for k in ("nInserted", "nUpserted", "nModified"))
+    if hasattr(result, "modified_count"):
+        return result.modified_count + (1 if result.upserted_id is not None else 0)
+
+    return 0  # cursors are counted by MeteredCursor
+
+
+def count_raw_docs(batch: bytes) -> int:
+    """number of documents in a raw batch, without decoding them"""
+    count = offset = 0
+    while offset < len(batch):
+        offset += int.from_bytes(batch[offset : offset + 4], "little")
+        count += 1
+
+    return count
+
+
+class CommandMetrics:
+    """latency histogram, documents and errors per (model, action)
+
+    metrics = enable_metrics()
+    return metrics_response()  # Prometheus text format
+
+    callbacks are called with (model, action, seconds, docs, error),
+    errors of callbacks are logged, not raised.
+    cursors are recorded when exhausted, closed or garbage collected.
+    """
+
+    def __init__(
+        self, buckets: Any = None, callbacks: Union[list, None] = None
+    ) -> None:
+        self.buckets = tuple(
+            buckets or (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+        )
+        self.callbacks = list(callbacks or [])
+        self.data = {}  # {(model, action): [counts of buckets, sum, docs, errors]}
+        self.lock = threading.Lock()
+
+    def run(self, model: Any, action: Any, *args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            result = model.with_session(action, *args, **kwargs)
+        except Exception as ex:
+            self.record(model, action, time.perf_counter() - start, error=ex)
+            raise
+
+        return self.measure(model, action, start, result)
+
+    def measure(self, model: Any, action: Any, start: float, result: Any) -> Any:
+        """record result of action started at start, cursors when consumed"""
+        if getattr(action, "__name__", action) in CURSOR_ACTIONS:
+            return MeteredCursor(self, model, action, start, result)
+
+        seconds = time.perf_counter() - start
+        self.record(model, action, seconds, get_doc_count(result))
+        return result
+
+    def record(
+        self,
+        model: Any,
+        action: Any,
+        seconds: float,
+        docs: int = 0,
+        error: Union[Exception, None] = None,
+    ) -> None:
+        key = model.__name__, getattr(action, "__name__", action)
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self.lock:
+            item = self.data.get(key)
+            if item is None:
+                item = self.data[key] = [0] * (len(self.buckets) + 1) + [0.0, 0, 0]
+
+            item[index] += 1
+            item[-3] += seconds
+            item[-2] += docs
+            if error is not None:
+                item[-1] += 1
+
+        for callback in self.callbacks:
+            try:
+                callback(key[0], key[1], seconds, docs, error)
+            except Exception:  # result of the command is not lost
+                logger.exception("metrics callback %r failed", callback)
+
+    def get_stats(self) -> dict:
+        """{(model, action): dict(count, sum, docs, errors, buckets)}"""
+        with self.lock:
+            data = {k: list(v) for k, v in self.data.items()}
+
+        stats = {}
+        for key, item in data.items():
+            counts = item[: len(self.buckets) + 1]
+            stats[key] = dict(
+                count=sum(counts),
+                sum=item[-3],
+                docs=item[-2],
+                errors=item[-1],
+                buckets=dict(zip(self.buckets + (float("inf"),), counts)),
+            )
+
+        return stats
+
+    def to_prometheus(self, prefix: str = "flaskmongorm") -> str:
+        name = f"{prefix}_command_duration_seconds"
+        durations = [f"# TYPE {name} histogram"]
+        docs = [f"# TYPE {prefix}_command_documents_total counter"]
+        errors = [f"# TYPE {prefix}_command_errors_total counter"]
+        for (model, action), stat in sorted(self.get_stats().items()):
+            labels = f'model="{model}",action="{action}"'
+            total = 0
+            for le, count in stat["buckets"].items():
+                total += count
+                le = "+Inf" if le == float("inf") else repr(le)
+                durations.append(f'{name}_bucket{{{labels},le="{le}"}} {total}')
+
+            durations.append(f"{name}_sum{{{labels}}} {stat['sum']}")
+            durations.append(f"{name}_count{{{labels}}} {total}")
+            docs.append(f"{prefix}_command_documents_total{{{labels}}} {stat['docs']}")
+            errors.append(f"{prefix}_command_errors_total{{{labels}}} {stat['errors']}")
+
+        return "\n".join(durations + docs + errors) + "\n"
+
+
+class MeteredCursor:
+    """cursor proxy of CommandMetrics, times the command until the cursor
+    is exhausted, closed or fails, and counts its documents
+    """
+
+    def __init__(
+        self,
+        metrics: CommandMetrics,
+        model: Any,
+        action: Any,
+        start: float,
+        cursor: Any,
+    ) -> None:
+        self._metrics = metrics
+        self._model = model
+        self._action = action
+        self._start = start
+        self._cursor = cursor
+        self._docs = 0
+        self._done = False
+
+    def _finish(self, error: Union[Exception, None] = None) -> None:
+        if not self._done:
+            self._done = True
+            seconds = time.perf_counter() - self._start
+            self._metrics.record(self._model, self._action, seconds, self._docs, error)
+
+    def _count(self, doc: Any) -> Any:
+        self._docs += count_raw_docs(doc) if isinstance(doc, bytes) else 1
+        return doc
+
+    def __getattr__(self, name: str) -> Any:
+        if "_cursor" not in self.__dict__:  # not initialized, e.g. copy
+            raise AttributeError(name)
+
+        value = getattr(self._cursor, name)
+        if not inspect.ismethod(value):
+            return value
+
+        @functools.wraps(value)
+        def method(*args: Any, **kwargs: Any) -> Any:
+            result = value(*args, **kwargs)
+            return self if result is self._cursor else result  # sort(), limit()
+
+        return method
+
+    def __getitem__(self, index: Any) -> Any:
+        return self._cursor[index]
+
+    def __iter__(self) -> "MeteredCursor":
+        return self
+
+    def __next__(self) -> Any:
+        try:
+            return self._count(next(self._cursor))
+        except StopIteration:
+            self._finish()
+            raise
+        except Exception as ex:
+            self._finish(ex)
+            raise
+
+    def __aiter__(self) -> "MeteredCursor":
+        return self
+
+    async def __anext__(self) -> Any:
+        try:
+            return self._count(await self._cursor.__anext__())
+        except StopAsyncIteration:
+            self._finish()
+            raise
+        except Exception as ex:
+            self._finish(ex)
+            raise
+
+    def next(self) -> Any:
+        if hasattr(self._cursor, "__anext__"):
+            return self.__anext__()
+
+        return self.__next__()
+
+    def close(self) -> Any:
+        self._finish()
+        return self._cursor.close()  # awaitable of async cursors
+
+    def __enter__(self) -> "MeteredCursor":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    async def __aenter__(self) -> "MeteredCursor":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    def __del__(self) -> None:
+        try:
+            self._finish()
+        except Exception:  # interpreter shutdown
+            pass
+
+
+def enable_metrics(*callbacks: Any, buckets: Any = None) -> CommandMetrics:
+    """record every command of models, see CommandMetrics"""
+    from . import BaseMixin
+
+    BaseMixin.__command_metrics__ = CommandMetrics(buckets, callbacks)
+    return BaseMixin.__command_metrics__
+
+
+def disable_metrics() -> None:
+    from . import BaseMixin
+
+    BaseMixin.__command_metrics__ = None
+
+
+def metrics_response(prefix: str = "flaskmongorm") -> Response:
+    """Prometheus text of enabled CommandMetrics"""
+    from . import BaseMixin
+
+    metrics = BaseMixin.__command_metrics__
+    text = metrics.to_prometheus(prefix) if metrics is not None else ""
+    return Response(text, mimetype="text/plain; version=0.0.4")
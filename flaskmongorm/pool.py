@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding=utf-8 -*-
+
+import threading
+from typing import Any, Union
+
+from pymongo.monitoring import ConnectionPoolListener
+
+# {pool option: config name}, MONGO_<DBKEY>_<NAME> or MONGO_<NAME>
+POOL_OPTIONS = dict(
+    maxPoolSize="MAX_POOL_SIZE",
+    minPoolSize="MIN_POOL_SIZE",
+    waitQueueTimeoutMS="WAIT_QUEUE_TIMEOUT_MS",
+    maxIdleTimeMS="MAX_IDLE_TIME_MS",
+)
+
+
+def get_pool_options(config: Any, dbkey: Union[str, None] = None) -> dict:
+    """pool options of db key from flask config"""
+    options = {}
+    for option, name in POOL_OPTIONS.items():
+        names = [f"MONGO_{dbkey.upper()}_{name}"] if dbkey else []
+        for key in names + [f"MONGO_{name}"]:
+            if key in config:
+                options[option] = config[key]
+                break
+
+    return options
+
+
+class PoolMetrics(ConnectionPoolListener):
+    """connection pool metrics of a client, see get_pool_metrics()"""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.size = 0  # open connections
+        self.checked_out = 0
+        self.waiting = 0  # waiting for checkout
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.failure_reasons = {}  # {reason: count}
+        self.wait_time = 0.0  # seconds of all checkouts
+        self.max_wait_time = 0.0
+        self.pool_clears = 0
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            attempts = self.checkouts + self.checkout_failures
+            return dict(
+                size=self.size,
+                checked_out=self.checked_out,
+                waiting=self.waiting,
+                checkouts=self.checkouts,
+                checkout_failures=self.checkout_failures,
+                failure_reasons=dict(self.failure_reasons),
+                wait_time=self.wait_time,
+                avg_wait_time=self.wait_time / attempts if attempts else 0,
+                max_wait_time=self.max_wait_time,
+                pool_clears=self.pool_clears,
+            )
+
+    def add_wait_time(self, event: Any) -> None:
+        duration = getattr(event, "duration", None) or 0  # pymongo >= 4.7
+        self.waiting -= 1
+        self.wait_time += duration
+        self.max_wait_time = max(self.max_wait_time, duration)
+
+    def connection_check_out_started(self, event: Any) -> None:
+        with self.lock:
+            self.waiting += 1
+
+    def connection_checked_out(self, event: Any) -> None:
+        with self.lock:
+            self.add_wait_time(event)
+            self.checked_out += 1
+            self.checkouts += 1
+
+    def connection_check_out_failed(self, event: Any) -> None:
+        with self.lock:
+            self.add_wait_time(event)
+            self.checkout_failures += 1
+            reason = str(event.reason)
+            self.failure_reasons[reason] = self.failure_reasons.get(reason, 0) + 1
+
+    def connection_checked_in(self, event: Any) -> None:
+        with self.lock:
+            self.checked_out -= 1
+
+    def connection_created(self, event: Any) -> None:
+        with self.lock:
+            self.size += 1
+
+    def connection_closed(self, event: Any) -> None:
+        with self.lock:
+            self.size -= 1
+
+    def pool_cleared(self, event: Any) -> None:
+        with self.lock:
+            self.pool_clears += 1
+
+    def pool_created(self, event: Any) -> None:
+        pass
+
+    def pool_ready(self, event: Any) -> None:
+        pass
+
+    def pool_closed(self, event: Any) -> None:
+        pass
+
+    def connection_ready(self, event: Any) -> None:
+        pass
@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+# -*- coding=utf-8 -*-
+
+from typing import Any
+
+
+def get_field_value(doc: Any, field: str) -> Any:
+    """value of (dotted) field from dict or model object"""
+    value = doc
+    for name in field.split("."):
+        if value is None:
+            break
+
+        value = value.get(name) if isinstance(value, dict) else value[name]
+
+    return value
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding=utf-8 -*-
+
+import logging
+import threading
+import weakref
+from concurrent.futures import Future
+from typing import Any
+
+from flask import current_app, has_app_context
+from pymongo import DeleteOne, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, WriteError
+
+BULK_WRITERS = weakref.WeakSet()  # flushed on app context teardown
+logger = logging.getLogger(__name__)
+
+
+class BulkWriter:
+    """write-behind buffer, queued operations go to one bulk_write()
+
+    flushed when max_size operations are queued, max_delay seconds after
+    the first queued one, on app context teardown or by flush().
+    each queued call returns a Future: result is a dict of
+    inserted_id/upserted_id/bulk_result, or WriteError of the operation.
+    operations are buffered per db key of the queuing context (the writer
+    is shared by requests of all tenants) and run outside transactions.
+    """
+
+    def __init__(self, model: Any, max_size: int = 1000, max_delay: float = 1.0):
+        self.model = model
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.buffers = {}  # {dbkey: [(op, future, doc)]}
+        self.size = 0
+        self.lock = threading.Lock()
+        self.timer = None
+        BULK_WRITERS.add(self)
+
+    def add(self, op: Any, doc: Any = None) -> Future:
+        future = Future()
+        dbkey = self.model.get_db_key()
+        with self.lock:
+            self.buffers.setdefault(dbkey, []).append((op, future, doc))
+            self.size += 1
+            size = self.size
+            if size == 1 and self.max_delay:
+                app = current_app._get_current_object() if has_app_context() else None
+                self.timer = threading.Timer(self.max_delay, self.flush_later, [app])
+                self.timer.daemon = True
+                self.timer.start()
+
+        if size >= self.max_size:
+            self.flush()
+
+        return future
+
+    def insert_one(self, doc: dict) -> Future:
+        return self.add(InsertOne(doc), doc)  # _id is set to doc by pymongo
+
+    def update_one(self, filter: Any, update: Any, **kwargs: Any) -> Future:
+        return self.add(UpdateOne(filter, update, **kwargs))
+
+    def delete_one(self, filter: Any, **kwargs: Any) -> Future:
+        return self.add(DeleteOne(filter, **kwargs))
+
+    def flush_later(self, app: Any = None) -> None:
+        try:
+            if app is None:
+                self.flush()
+            else:
+                with app.app_context():
+                    self.flush()
+        except Exception:  # set to futures, nobody to raise to in timer
+            logger.exception("flushing bulk writer of %s failed", self.model)
+
+    def flush(self) -> dict:
+        """write buffered operations, return {dbkey: bulk result}"""
+        with self.lock:
+            buffers = self.buffers
+            self.buffers, self.size = {}, 0
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+
+        results = {}
+        error = None
+        for dbkey, buffer in buffers.items():
+            try:
+                results[dbkey] = self.write(dbkey, buffer)
+            except Exception as ex:  # other db keys are still written
+                error = ex
+
+        if error is not None:
+            raise error
+
+        return results
+
+    def write(self, dbkey: str, buffer: list) -> Any:
+        ops = [op for op, _, _ in buffer]
+        coll = self.model.get_wrapped_coll({}, dbkey=dbkey)
+        errors = {}
+        try:
+            result = self.model._run(
+                coll.bulk_write, ops, ordered=False, no_session=True
+            )
+            upserted_ids = result.upserted_ids or {}
+        except BulkWriteError as ex:
+            result = ex.details
+            upserted_ids = {u["index"]: u["_id"] for u in result.get("upserted", [])}
+            for error in result.get("writeErrors", []):
+                errors[error["index"]] = WriteError(
+                    error.get("errmsg"), error.get("code"), error
+                )
+        except Exception as ex:
+            for _, future, _ in buffer:
+                future.set_exception(ex)
+
+            raise
+
+        for i, (_, future, doc) in enumerate(buffer):
+            if i in errors:
+                future.set_exception(errors[i])
+            else:
+                future.set_result(
+                    dict(
+                        inserted_id=None if doc is None else doc.get("_id"),
+                        upserted_id=upserted_ids.get(i),
+                        bulk_result=result,
+                    )
+                )
+
+        return result
+
+
+def flush_bulk_writers(*args: Any) -> None:
+    """flush all writers on teardown, errors are set to futures and logged"""
+    for writer in list(BULK_WRITERS):
+        try:
+            writer.flush()
+        except Exception:
+            logger.exception("flushing bulk writer of %s failed", writer.model)
@@ -0,0 +1,172 @@
+import inspect
+import os
+
+import bson
+import pytest
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from flask import Flask
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from flaskmongorm import BaseModel
+
+# local mongod for tests which mongomock can't run, skipped if not set, e.g.
+# MONGO_URI=mongodb://localhost:27017/flaskmongorm_test?replicaSet=rs0
+MONGO_URI = os.environ.get("MONGO_URI")
+
+
+class RawCursor(list):
+    def close(self) -> None:
+        pass
+
+
+class MockCollection:
+    """mongomock collection with bson codec options, and raw documents if
+    raw (mongomock has no RawBSONDocument document_class)
+    """
+
+    def __init__(self, coll, raw: bool = False) -> None:
+        self.coll = coll
+        self.raw = raw
+        self.codec_options = CodecOptions(
+            tz_aware=True, document_class=RawBSONDocument if raw else dict
+        )
+
+    def __getattr__(self, name):
+        return getattr(self.coll, name)
+
+    def to_raw(self, doc):
+        return RawBSONDocument(bson.encode(doc), self.codec_options)
+
+    def find(self, *args, **kwargs):
+        cur = self.coll.find(*args, **kwargs)
+        return RawCursor(map(self.to_raw, cur)) if self.raw else cur
+
+    def find_one(self, *args, **kwargs):
+        doc = self.coll.find_one(*args, **kwargs)
+        return self.to_raw(doc) if self.raw and doc is not None else doc
+
+
+class FakeSession:
+    """session of fake_transactions, commit and abort are recorded"""
+
+    def __init__(self) -> None:
+        self.in_transaction = False
+        self.ended = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        pass
+
+    def start_transaction(self, **kwargs) -> None:
+        self.in_transaction = True
+
+    def commit_transaction(self) -> None:
+        self.in_transaction = False
+        self.ended.append("commit")
+
+    def abort_transaction(self) -> None:
+        self.in_transaction = False
+        self.ended.append("abort")
+
+
+class NoSessionCollection(MockCollection):
+    """mongomock collection which drops session args (no transactions)"""
+
+    def __getattr__(self, name):
+        attr = getattr(self.coll, name)
+        if not inspect.ismethod(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            kwargs.pop("session", None)
+            return attr(*args, **kwargs)
+
+        return call
+
+    def find(self, *args, **kwargs):
+        kwargs.pop("session", None)
+        return super().find(*args, **kwargs)
+
+    def find_one(self, *args, **kwargs):
+        kwargs.pop("session", None)
+        return super().find_one(*args, **kwargs)
+
+
+def get_server_info(uri: str):
+    try:
+        with MongoClient(uri, serverSelectionTimeoutMS=1000) as client:
+            return client.admin.command("hello")
+    except PyMongoError:
+        return None
+
+
+@pytest.fixture(scope="session")
+def mongo_uri():
+    if not MONGO_URI or get_server_info(MONGO_URI) is None:
+        pytest.skip("needs a mongod, set MONGO_URI")
+
+    return MONGO_URI
+
+
+@pytest.fixture(scope="session")
+def replica_set_uri(mongo_uri):
+    if "setName" not in get_server_info(mongo_uri):
+        pytest.skip("needs a replica set, set MONGO_URI")
+
+    return mongo_uri
+
+
+@pytest.fixture
+def client():
+    mongomock = pytest.importorskip("mongomock")
+    return mongomock.MongoClient(tz_aware=True)
+
+
+@pytest.fixture
+def app(client, monkeypatch):
+    app = Flask(__name__)
+    BaseModel.init_app(app, uri="mongodb://localhost:27017/testdb")
+    monkeypatch.setitem(BaseModel.__clients__, "testdb", client)
+    monkeypatch.setitem(BaseModel.__dbs__, "testdb", client["testdb"])
+    BaseModel.__wrapped_colls__.clear()
+
+    get_wrapped_coll = BaseModel.get_wrapped_coll.__func__
+
+    def get_mock_coll(cls, kwargs, raw=False, dbkey=None, read_preference=None):
+        coll = get_wrapped_coll(cls, kwargs, False, dbkey, read_preference)
+        return MockCollection(coll, raw)
+
+    monkeypatch.setattr(BaseModel, "get_wrapped_coll", classmethod(get_mock_coll))
+    with app.test_request_context():
+        yield app
+
+
+@pytest.fixture
+def fake_transactions(app, monkeypatch):
+    """transaction() blocks on mongomock, yield sessions started in them"""
+    sessions = []
+
+    class Client:
+        def start_session(self):
+            sessions.append(FakeSession())
+            return sessions[-1]
+
+    get_wrapped_coll = BaseModel.get_wrapped_coll.__func__
+    get_collection = BaseModel.get_collection.__func__
+
+    def get_mock_coll(cls, kwargs, raw=False, dbkey=None, read_preference=None):
+        coll = get_wrapped_coll(cls, kwargs, raw, dbkey, read_preference)
+        return NoSessionCollection(coll.coll, raw)
+
+    monkeypatch.setattr(BaseModel, "get_client", classmethod(lambda cls: Client()))
+    monkeypatch.setattr(BaseModel, "get_wrapped_coll", classmethod(get_mock_coll))
+    monkeypatch.setattr(
+        BaseModel,
+        "get_collection",
+        classmethod(lambda cls: NoSessionCollection(get_collection(cls))),
+    )
+    yield sessions
@@ -0,0 +1,125 @@
+import asyncio
+import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+from flask import Flask
+
+from flaskmongorm.aio import AsyncBaseModel
+
+
+class Item(AsyncBaseModel):
+    __collection__ = "async_items"
+    __default_values__ = dict(tags=[])
+
+
+def run(uri: str, test, app_context: bool = True) -> None:
+    """run test on a new client, async clients are bound to one loop
+
+    app_context=False: like a plain asyncio worker
+    """
+
+    async def main() -> None:
+        app = Flask(__name__)
+        Item.init_app(app, uri=uri, dbname="flaskmongorm_test")
+        try:
+            await Item.delete_many({})
+            if app_context:
+                with app.app_context():
+                    await test()
+            else:
+                await test()
+        finally:
+            await Item.get_client().close()
+
+    asyncio.run(main())
+
+
+@pytest.fixture
+def mongo(mongo_uri):
+    return lambda test, **kwargs: run(mongo_uri, test, **kwargs)
+
+
+def test_sync_only_methods():
+    for method in (
+        lambda: Item.aggregate_response([]),
+        Item.get_bulk_writer,
+        Item.consume_changes,
+        Item.watch_cache,
+        Item.materialize,
+    ):
+        with pytest.raises(TypeError):
+            method()
+
+
+def test_crud(mongo):
+    async def test():
+        await Item.insert_many([dict(_id=i, n=i) for i in range(5)])
+        obj = await Item.find_one(1)
+        assert isinstance(obj, Item) and obj.n == 1 and obj.tags == []
+        cur = await Item.find({"n": {"$gte": 2}}, sort="n desc", count=True)
+        assert [obj.n for obj in cur.objects] == [4, 3, 2] and cur.total == 3
+        await Item.update_one({"_id": 1}, {"$set": {"n": 10}})
+        assert (await Item.find_one(1)).n == 10
+        await Item.delete_one({"_id": 1})
+        assert await Item.find_one(1) is None
+        docs = await Item.aggregate([{"$group": {"_id": None, "n": {"$sum": "$n"}}}])
+        assert docs == [{"_id": None, "n": 9}]
+
+    mongo(test)
+
+
+def test_async_iteration(mongo):
+    async def test():
+        await Item.insert_many([dict(_id=i) for i in range(7)])
+        ids = [obj.id async for obj in await Item.find_iter({}, sort="_id")]
+        assert ids == list(range(7))
+        batches = [len(b) async for b in Item.find_batches({}, batch_size=3)]
+        assert sum(batches) == 7
+        objects = [obj async for obj in Item.aggregate_iter([{"$sort": {"_id": -1}}])]
+        assert [obj["_id"] for obj in objects] == list(range(6, -1, -1))
+
+    mongo(test)
+
+
+def test_without_app_context(mongo, monkeypatch):
+    monkeypatch.setattr(Item, "__timezone__", "Asia/Shanghai")
+
+    async def test():
+        await Item.insert_one(dict(_id=1, at=datetime.datetime(2024, 1, 1)))
+        obj = await Item.find_one(1)
+        assert obj.at.tzinfo == ZoneInfo("Asia/Shanghai")
+        assert [obj.id async for obj in await Item.find_iter({})] == [1]
+
+    mongo(test, app_context=False)
+
+
+def test_keyset_pages(mongo):
+    async def test():
+        await Item.insert_many([dict(_id=i) for i in range(5)])
+        page = await Item.find({}, keyset=True, sort="_id", limit=2)
+        page = await Item.find(
+            {}, keyset=True, sort="_id", limit=2, cursor=page.next_cursor
+        )
+        assert [obj.id for obj in page.objects] == [2, 3]
+
+    mongo(test)
+
+
+def test_transaction(mongo, replica_set_uri):
+    async def test():
+        await Item.insert_one(dict(_id=1, n=1))
+        with pytest.raises(ValueError):
+            async with Item.transaction():
+                await Item.update_one({"_id": 1}, {"$set": {"n": 2}})
+                raise ValueError("rollback")
+
+        assert (await Item.find_one(1)).n == 1
+
+        async def update() -> None:
+            await Item.update_one({"_id": 1}, {"$set": {"n": 3}})
+
+        await Item.run_in_transaction(update)
+        assert (await Item.find_one(1)).n == 3
+
+    mongo(test)
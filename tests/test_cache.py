@@ -0,0 +1,95 @@
+import time
+
+from flaskmongorm import BaseModel, QueryCache
+
+
+class Config(BaseModel):
+    __collection__ = "configs"
+    __cache__ = True
+
+
+class Backend:
+    """backend without version"""
+
+    def __init__(self) -> None:
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ttl=None):
+        self.data[key] = value
+
+    def clear(self):
+        self.data.clear()
+
+
+def test_query_cache():
+    cache = QueryCache(maxsize=2, ttl=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # b is least recently used
+    assert list(cache.data) == ["a", "c"]
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    version = cache.version
+    cache.clear()
+    assert cache.version != version
+
+
+def test_cached_reads(app):
+    cache = Config.__cache__
+    cache.clear()
+    Config.insert_many([dict(_id=i, n=i) for i in range(3)])
+    assert Config.find_one({"_id": 1, "n": 1}).n == 1
+    assert Config.find_one({"n": 1, "_id": 1}).n == 1  # same normalized query
+    assert cache.hits == 1 and len(cache.data) == 1
+    cur = Config.find({"n": {"$gt": 0}, "_id": {"$lt": 5}}, sort="n", count=True)
+    same = Config.find({"_id": {"$lt": 5}, "n": {"$gt": 0}}, sort="n", count=True)
+    assert [obj.n for obj in same.objects] == [obj.n for obj in cur.objects] == [1, 2]
+    assert same.total == 2 and cache.hits == 2
+    assert Config.find({}, as_list=False, sort="n") is not None  # not cached
+    assert len(cache.data) == 2
+
+
+def test_writes_clear_cache(app):
+    Config.insert_one(dict(_id=1, n=1))
+    assert Config.find_one(1).n == 1
+    Config.update_one({"_id": 1}, {"$set": {"n": 2}})
+    assert not Config.__cache__.data
+    assert Config.find_one(1).n == 2
+    Config.delete_one({"_id": 1})
+    assert Config.find_one(1) is None
+
+
+def test_fetch_during_write_is_not_cached(app, monkeypatch):
+    for cache in (QueryCache(), Backend()):
+        monkeypatch.setattr(Config, "__cache__", cache)
+
+        def fetch():
+            Config.insert_one(dict(n=1))  # write while fetching
+            return "stale"
+
+        assert Config.get_cached("key", fetch) == "stale"
+        assert cache.get("key") is None
+        assert Config.get_cached("key", lambda: "fresh") == "fresh"
+        assert cache.get("key") == "fresh"
+
+
+class Other(BaseModel):
+    __collection__ = "others"
+    __cache__ = True
+
+
+def test_commit_clears_written_models(fake_transactions):
+    Other.insert_one(dict(_id=1))
+    assert Other.find_one(1) is not None and Other.__cache__.data
+    with Config.transaction():
+        Config.insert_one(dict(_id=1, n=1))
+        Config.__cache__.set("read before commit", "stale")
+        Other.find_one(1)  # reads don't clear caches
+
+    assert fake_transactions[-1].ended == ["commit"]
+    assert not Config.__cache__.data
+    assert Other.__cache__.data
@@ -0,0 +1,83 @@
+import pytest
+
+from flaskmongorm import BaseModel, MaterializedView, Reference, diff_fields
+
+
+class Doc(BaseModel):
+    __collection__ = "tracked_docs"
+    __track_changes__ = True
+
+
+class Note(BaseModel):
+    __collection__ = "notes"
+    __references__ = dict(doc=Reference(Doc, "doc_id"))
+
+
+def test_diff_fields():
+    old = dict(a=1, b=dict(c=1, d=dict(e=1)), f=[1, 2], g=1, h=None)
+    new = dict(a=1.0, b=dict(c=1, d=dict(e=2), x=1), f=[1, 2, 3], h=None, i=0)
+    sets, unsets = diff_fields(old, new)
+    assert sets == {"a": 1.0, "b.d.e": 2, "b.x": 1, "f": [1, 2, 3], "i": 0}
+    assert unsets == {"g": ""}
+    assert diff_fields(old, old) == ({}, {})
+
+
+def test_save_changed_fields(app):
+    Doc.insert_one(dict(_id=1, name="a", sub=dict(x=1, y=[1]), gone=1))
+    for lazy in (False, True):
+        obj = Doc.find_one(1, lazy=lazy)
+        assert obj.get_changes() == {}
+        assert obj.save() is None  # nothing to update
+
+        obj.name = f"b{lazy}"
+        obj.sub["y"].append(2)
+        obj["new"] = dict(k=1)
+        obj.__dict__.pop("gone", None)
+        assert obj.get_changes() == {
+            "$set": {"name": f"b{lazy}", "sub.y": [1, 2], "new": dict(k=1)},
+            "$unset": {"gone": ""},
+        }
+        assert obj.save().modified_count == 1
+        assert obj.get_changes() == {}
+        doc = Doc.find_one(1, as_raw=True)
+        assert doc == dict(
+            _id=1, name=f"b{lazy}", sub=dict(x=1, y=[1, 2]), new=dict(k=1)
+        )
+        Doc.replace_one({"_id": 1}, dict(name="a", sub=dict(x=1, y=[1]), gone=1))
+
+
+def test_save_with_update_args(app):
+    Doc.insert_one(dict(_id=2, n=1))
+    obj = Doc.find_one(2)
+    obj.n = 5
+    obj.save({"$inc": {"n": 1}})  # explicit update, not tracked changes
+    assert Doc.find_one(2).n == 2
+
+
+def test_save_objects_of_other_reads(app):
+    Doc.insert_many([dict(_id=i, n=i) for i in range(1, 7)])
+    Note.insert_one(dict(_id=1, doc_id=5))
+    view = MaterializedView(Doc)
+    view.put(dict(_id=6, n=6))
+    objects = [
+        Doc.find({"_id": 1}, count="facet").objects[0],
+        Doc.find_fanout({"_id": 2}, dbkeys=["testdb"]).objects[0],
+        Doc.aggregate_fanout([{"$match": {"_id": 3}}], as_raw=False)[0],
+        next(iter(Doc.aggregate_iter([{"$match": {"_id": 4}}], as_raw=False))),
+        Note.find({}, prefetch="doc", limit=1).objects[0].doc,  # $lookup
+        view[6],
+    ]
+    for obj in objects:
+        obj.n += 10
+        assert obj.save().modified_count == 1
+
+    assert [obj.n for obj in Doc.find({}, sort="_id").objects] == list(range(11, 17))
+
+
+def test_save_without_changes_or_update(app):
+    class Plain(BaseModel):
+        __collection__ = "plain_docs"
+
+    Plain.insert_one(dict(_id=1, n=1))
+    with pytest.raises(TypeError):
+        Plain.find_one(1).save()
@@ -0,0 +1,141 @@
+import datetime
+import time
+from zoneinfo import ZoneInfo
+
+import pytest
+from flask import Flask
+
+from flaskmongorm import BaseModel, ChangeStreamConsumer
+
+
+class Event(BaseModel):
+    __collection__ = "changestream_events"
+
+
+def wait_for(condition, timeout: float = 10) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+
+        time.sleep(0.05)
+
+    return False
+
+
+class Stream:
+    """change stream without changes"""
+
+    alive = True
+    resume_token = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        pass
+
+    def try_next(self):
+        time.sleep(0.01)
+
+
+class Model:
+    """model whose resume token collection is down"""
+
+    __resume_tokens__ = "tokens"
+
+    @classmethod
+    def get_db(cls):
+        raise ConnectionError("down")
+
+    @classmethod
+    def watch(cls, pipeline, **kwargs):
+        return Stream()
+
+
+class View:
+    """handler whose first reset() fails"""
+
+    def __init__(self) -> None:
+        self.resets = 0
+
+    def reset(self) -> None:
+        self.resets += 1
+        if self.resets == 1:
+            raise ValueError("not loaded")
+
+    def __call__(self, change) -> None:
+        pass
+
+
+def test_consumer_retries_failed_reset():
+    view = View()
+    consumer = ChangeStreamConsumer(Model, view).start()
+    try:
+        assert wait_for(lambda: consumer.synced_at is not None)
+        assert isinstance(consumer.error, ValueError) and view.resets == 2
+    finally:
+        consumer.stop()
+
+
+def test_consumer_retries_failed_token_load():
+    consumer = ChangeStreamConsumer(Model, View(), name="worker").start()
+    try:
+        assert wait_for(lambda: isinstance(consumer.error, ConnectionError))
+        assert consumer.thread.is_alive() and consumer.synced_at is None
+    finally:
+        consumer.stop()
+
+
+@pytest.fixture
+def app(replica_set_uri):
+    app = Flask(__name__)
+    BaseModel.init_app(app, uri=replica_set_uri)
+    with app.app_context():
+        Event.delete_many({})
+        Event.get_db()[Event.__resume_tokens__].delete_many({})
+        yield app
+
+
+def test_consumer_handles_changes(app):
+    changes = []
+    consumer = Event.consume_changes(changes.append)
+    try:
+        assert wait_for(lambda: consumer.synced_at is not None)
+        Event.insert_one(dict(n=1))
+        assert wait_for(lambda: changes)
+        assert changes[0]["fullDocument"]["n"] == 1
+    finally:
+        consumer.stop()
+
+
+def test_changes_decoded_like_find(app):
+    app.config["TIMEZONE"] = "Asia/Shanghai"
+    changes = []
+    consumer = Event.consume_changes(changes.append)
+    try:
+        assert wait_for(lambda: consumer.synced_at is not None)
+        at = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+        Event.insert_one(dict(at=at))
+        assert wait_for(lambda: changes)
+        assert changes[0]["fullDocument"]["at"].tzinfo == ZoneInfo("Asia/Shanghai")
+    finally:
+        consumer.stop()
+
+
+def test_resume_tokens_by_name(app):
+    coll = Event.get_db()[Event.__resume_tokens__]
+    consumers = [
+        Event.consume_changes(lambda change: None, name=name, save_delay=0)
+        for name in ("worker-a", "worker-b")
+    ]
+    unnamed = Event.consume_changes(lambda change: None, save_delay=0)
+    try:
+        assert wait_for(lambda: all(c.synced_at for c in consumers + [unnamed]))
+        Event.insert_one(dict(n=2))
+        assert wait_for(lambda: coll.count_documents({}) == 2)
+    finally:
+        for consumer in consumers + [unnamed]:
+            consumer.stop()
+
+    assert sorted(doc["_id"] for doc in coll.find()) == ["worker-a", "worker-b"]
@@ -0,0 +1,24 @@
+from flask import g
+
+from flaskmongorm import BaseModel
+
+
+class Metric(BaseModel):
+    """one collection per period"""
+
+    __collection__ = "metrics"
+
+    @classmethod
+    def get_collection(cls):
+        return cls.get_db()[f"metrics_{g.period}"]
+
+
+def test_wrapped_coll_of_overridden_collection(app):
+    for period in ("2024_01", "2024_02"):
+        g.period = period
+        Metric.insert_one(dict(period=period))
+        assert Metric.get_wrapped_coll({}).name == f"metrics_{period}"
+        assert Metric.find_one({}).period == period
+        assert Metric.count_documents({}, read_preference="nearest") == 1
+
+    assert Metric.get_collection_name() == "metrics_2024_02"
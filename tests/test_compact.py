@@ -0,0 +1,50 @@
+from flaskmongorm import BaseModel
+
+FIELDS = ["_id", "name", "age", "city"]
+
+
+class Plain(BaseModel):
+    __collection__ = "plain"
+    __default_values__ = dict(age=0, level=1)
+
+
+class Compact(Plain):
+    __collection__ = "compact"
+    __fields__ = FIELDS
+
+
+def test_compact_class():
+    obj = Compact(_id=1, name="a", extra=3)
+    assert type(obj) is Compact.__compactcls__
+    assert isinstance(obj, Compact) and isinstance(obj, Plain)
+    assert "name" not in obj.__dict__ and obj.__dict__ == dict(extra=3)
+    assert type(Plain(name="a")) is Plain
+
+
+def test_compact_fields_and_defaults():
+    obj = Compact(_id=1, name="a", extra=3)
+    assert (obj.name, obj["name"], obj.extra, obj["extra"]) == ("a", "a", 3, 3)
+    assert (obj.age, obj["age"], obj.level, obj["level"]) == (0, 0, 1, 1)
+    assert (obj.city, obj["city"], obj.missing) == (None, None, None)
+    obj.city = "x"
+    obj["age"] = 5
+    obj["other"] = 1
+    assert (obj.city, obj.age, obj.other) == ("x", 5, 1)
+    assert obj.id == 1
+
+
+def test_compact_to_dict():
+    obj = Compact(_id=1, name="a", extra=3)
+    plain = Plain(_id=1, name="a", extra=3)
+    assert obj.to_dict() == plain.to_dict()
+    assert obj.to_dict(onlys=["name"]) == plain.to_dict(onlys=["name"])
+
+
+def test_compact_subclass():
+    class Sub(Compact):
+        __collection__ = "sub"
+
+    obj = Sub(name="b")
+    assert isinstance(obj, Sub) and type(obj) is Sub.__compactcls__
+    assert type(obj).__collection__ == "sub"
+    assert obj.to_dict() == dict(name="b", age=0, level=1)
@@ -0,0 +1,46 @@
+from types import MappingProxyType
+
+import pytest
+
+from flaskmongorm import BaseModel
+
+
+class A(BaseModel):
+    __default_values__ = dict(a=1, tags=[])
+
+
+class B(A):
+    __default_values__ = dict(b=2)
+
+
+class C(B):
+    __default_values__ = dict(c=3, a=10)
+
+
+def test_merged_defaults():
+    assert isinstance(C.__all_defaults__, MappingProxyType)
+    assert C.get_all_defaults() == dict(a=10, b=2, c=3, tags=[])
+    assert B.get_all_defaults() == dict(a=1, b=2, tags=[])
+    obj = C(b=20)
+    assert (obj.a, obj.b, obj.c, obj.missing) == (10, 20, 3, None)
+    assert (obj["a"], obj["b"], obj["missing"]) == (10, 20, None)
+
+
+def test_get_all_defaults_is_a_copy():
+    C.get_all_defaults()["a"] = 100
+    assert C().a == 10
+    with pytest.raises(TypeError):
+        C.__all_defaults__["a"] = 100
+
+
+def test_reset_defaults():
+    class D(BaseModel):
+        __default_values__ = dict(x=1)
+
+    class E(D):
+        pass
+
+    D.__default_values__["x"] = 2
+    assert E().x == 1  # until reset
+    D.reset_defaults()
+    assert D().x == 2 and E().x == 2
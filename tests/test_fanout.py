@@ -0,0 +1,64 @@
+import datetime
+
+import pytest
+from bson.objectid import ObjectId
+
+from flaskmongorm import BaseModel, get_bson_order, merge_sorted
+
+OID = ObjectId()
+AT = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class Shard(BaseModel):
+    __collection__ = "shards"
+
+
+@pytest.fixture
+def shards(app, client, monkeypatch):
+    monkeypatch.setitem(BaseModel.__dbs__, "otherdb", client["otherdb"])
+    client["testdb"]["shards"].insert_many(
+        [dict(_id=1), dict(_id=2, v=3), dict(_id=3, v="b"), dict(_id=4, v=True)]
+    )
+    client["otherdb"]["shards"].insert_many(
+        [dict(_id=5, v=1.5), dict(_id=6, v="a"), dict(_id=7, v=OID)]
+        + [dict(_id=8, v=AT), dict(_id=9, v=None)]
+    )
+    return ["testdb", "otherdb"]
+
+
+def test_bson_order():
+    values = [AT, True, OID, "b", "a", 3, 1.5, None]
+    assert sorted(values, key=get_bson_order) == values[::-1]
+    assert get_bson_order(False) < get_bson_order(True) < get_bson_order(AT)
+
+
+def test_merge_sorted():
+    results = [[dict(n=1), dict(n=4)], [dict(n=2), dict(n=3), dict(n=5)]]
+    merged = merge_sorted(results, [("n", 1)], skip=1, limit=3)
+    assert [doc["n"] for doc in merged] == [2, 3, 4]
+    results = [[dict(n=4, m=1), dict(n=1)], [dict(n=4, m=2), dict(n=2)]]
+    merged = merge_sorted(results, [("n", -1), ("m", -1)])
+    assert [(doc["n"], doc.get("m")) for doc in merged] == [
+        (4, 2),
+        (4, 1),
+        (2, None),
+        (1, None),
+    ]
+    assert merge_sorted([[1, 2], [3]], limit=2) == [1, 2]  # unsorted
+
+
+def test_find_fanout(shards):
+    cur = Shard.find_fanout({}, dbkeys=shards, sort="v, _id", count=True)
+    assert [obj.id for obj in cur.objects] == [1, 9, 5, 2, 6, 3, 7, 4, 8]
+    assert cur.total == 9
+    page = Shard.find_fanout({}, dbkeys=shards, sort="v desc", skip=2, limit=3)
+    assert [obj.v for obj in page.objects] == [OID, "b", "a"]
+    docs = Shard.find_fanout({"v": {"$type": "string"}}, sort="v", as_raw=True)
+    assert docs.objects == [dict(_id=6, v="a"), dict(_id=3, v="b")]
+
+
+def test_aggregate_fanout(shards):
+    pipeline = [{"$match": {"v": {"$type": "number"}}}, {"$sort": {"v": -1}}]
+    docs = Shard.aggregate_fanout(pipeline, dbkeys=shards, sort="v desc")
+    assert docs == [dict(_id=2, v=3), dict(_id=5, v=1.5)]
+    assert Shard.count_fanout({"v": {"$exists": True}}, dbkeys=shards) == 8
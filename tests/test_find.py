@@ -0,0 +1,130 @@
+import pytest
+
+from flaskmongorm import BaseModel, FacetCursor, decode_cursor, encode_cursor
+
+
+class Item(BaseModel):
+    __collection__ = "items"
+    __count_limit__ = 5
+
+
+@pytest.fixture
+def items(app):
+    Item.insert_many([dict(_id=i, n=i % 3) for i in range(12)])
+
+
+def test_count_strategies(items):
+    assert Item.find({}).total is None
+    assert Item.find({}, count=True).total == 12
+    assert Item.find({"n": 0}, count="exact").total == 4
+    assert Item.find({}, count="estimated").total == 12
+    assert Item.find({"n": 0}, count="estimated").total == 4
+    assert Item.find({}, count="capped").total == 5
+    with pytest.raises(AssertionError):
+        Item.find({}, count="unknown")
+
+
+def test_count_facet(items):
+    cur = Item.find({"n": 1}, sort="_id desc", skip=1, limit=2, count="facet")
+    assert isinstance(cur, FacetCursor)
+    assert [obj.id for obj in cur.objects] == [7, 4]
+    assert cur.total == 4
+
+
+def get_ids(cur) -> list:
+    return [obj.id for obj in cur.objects]
+
+
+def test_keyset_pages(items):
+    page = Item.find({"n": {"$ne": 2}}, keyset=True, sort="n, _id", limit=3)
+    assert get_ids(page) == [0, 3, 6] and page.total is None
+    assert page.prev_cursor is None
+    page = Item.find(
+        {"n": {"$ne": 2}}, cursor=page.next_cursor, keyset=True, sort="n, _id", limit=3
+    )
+    assert get_ids(page) == [9, 1, 4]
+    last = Item.find(
+        {"n": {"$ne": 2}},
+        cursor=page.next_cursor,
+        keyset=True,
+        sort="n, _id",
+        limit=3,
+        count=True,
+    )
+    assert get_ids(last) == [7, 10] and last.next_cursor is None
+    assert last.total == 8
+    prev = Item.find(
+        {"n": {"$ne": 2}}, cursor=last.prev_cursor, keyset=True, sort="n, _id", limit=3
+    )
+    assert get_ids(prev) == [9, 1, 4]
+    first = Item.find(
+        {"n": {"$ne": 2}}, cursor=prev.prev_cursor, keyset=True, sort="n, _id", limit=3
+    )
+    assert get_ids(first) == [0, 3, 6]
+
+
+def test_decode_cursor():
+    token = encode_cursor([1, "a"], "prev")
+    assert decode_cursor(token, 2) == ([1, "a"], "prev")
+    for token in (
+        "!!",
+        encode_cursor([1], "next"),  # one value per sort field
+        encode_cursor([1, 2], "up"),
+        encode_cursor([{"$gt": ""}, 1], "next"),
+        encode_cursor([[{"a": {"$ne": 1}}], 1], "next"),
+    ):
+        with pytest.raises(ValueError):
+            decode_cursor(token, 2)
+
+
+def test_keyset_invalid_cursor(items):
+    token = encode_cursor([{"$gt": -1}], "next")
+    with pytest.raises(ValueError):
+        Item.find({}, cursor=token, keyset=True, sort="_id")
+
+
+class Pagination:
+    @staticmethod
+    def get_page_args(page_name: str, per_page_name: str) -> tuple:
+        return 1, 3, 0
+
+
+def test_keyset_invalid_cursor_of_url(items, app, monkeypatch):
+    monkeypatch.setattr(Item, "__paginatecls__", Pagination)
+    for token in ("bad", encode_cursor([{"$gt": -1}], "next")):
+        with app.test_request_context("/", query_string=dict(cursor=token)):
+            page = Item.find({}, keyset=True, paginate=True, sort="_id")
+            assert get_ids(page) == [0, 1, 2] and page.prev_cursor is None
+
+    with app.test_request_context("/", query_string=dict(cursor=page.next_cursor)):
+        assert get_ids(Item.find({}, keyset=True, paginate=True, sort="_id")) == [
+            3,
+            4,
+            5,
+        ]
+
+
+def test_keyset_nullable_sort_field(app):
+    Item.insert_many(
+        [dict(_id=1, n=2), dict(_id=2), dict(_id=3, n=1), dict(_id=4, n=None)]
+        + [dict(_id=5, n=3)]
+    )
+    pages, cursor = [], None
+    while True:
+        page = Item.find({}, keyset=True, sort="n", limit=2, cursor=cursor)
+        pages.append(get_ids(page))
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert pages == [[2, 4], [3, 1], [5]]
+    prev = Item.find({}, keyset=True, sort="n", limit=2, cursor=page.prev_cursor)
+    assert get_ids(prev) == [3, 1]
+    prev = Item.find({}, keyset=True, sort="n", limit=2, cursor=prev.prev_cursor)
+    assert get_ids(prev) == [2, 4] and prev.prev_cursor is None
+
+    page = Item.find({}, keyset=True, sort="n desc", limit=2)
+    page = Item.find({}, keyset=True, sort="n desc", limit=2, cursor=page.next_cursor)
+    assert get_ids(page) == [3, 2]
+    page = Item.find({}, keyset=True, sort="n desc", limit=2, cursor=page.next_cursor)
+    assert get_ids(page) == [4] and page.next_cursor is None
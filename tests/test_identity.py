@@ -0,0 +1,28 @@
+from flaskmongorm import BaseModel
+
+
+class Tenant(BaseModel):
+    __collection__ = "tenants"
+    __identity_map__ = True
+
+
+def test_same_object_in_app_context(app):
+    Tenant.insert_many([dict(_id=i, n=i) for i in range(3)])
+    obj = Tenant.find_one({"_id": 1})
+    assert Tenant.find_one({"_id": 1}) is obj
+    objects = Tenant.find({}, sort="_id").objects
+    assert objects[1] is obj
+    assert Tenant.find_one({"_id": 2}) is objects[2]
+    assert Tenant.find_one({"_id": 1}, {"n": 1}) is not obj  # projected
+    assert Tenant.find({}, sort="_id", count="facet").objects[1] is obj
+
+    with app.app_context():  # other request
+        assert Tenant.find_one({"_id": 1}) is not obj
+
+
+def test_writes_clear_identity_map(app):
+    Tenant.insert_one(dict(_id=1, n=1))
+    obj = Tenant.find_one({"_id": 1})
+    Tenant.update_one({"_id": 1}, {"$set": {"n": 2}})
+    fresh = Tenant.find_one({"_id": 1})
+    assert fresh is not obj and fresh.n == 2
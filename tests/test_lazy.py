@@ -0,0 +1,51 @@
+import bson
+from bson.codec_options import CodecOptions
+
+from flaskmongorm import BaseModel, LazyMixin
+
+OPTS = CodecOptions(tz_aware=True)
+
+
+class User(BaseModel):
+    __collection__ = "lazy_users"
+    __default_values__ = dict(age=0)
+
+
+class Compact(User):
+    __collection__ = "lazy_compact"
+    __fields__ = ["_id", "name", "age"]
+
+
+DOC = dict(_id=1, name="a", extra=dict(x=1))
+
+
+def test_lazy_object():
+    for model in (User, Compact):
+        obj = model.from_raw(bson.encode(DOC), OPTS)
+        assert isinstance(obj, model) and isinstance(obj, LazyMixin)
+        assert obj.__rawdoc__._doc is None  # nothing decoded yet
+        assert (obj.name, obj["name"], obj.extra, obj.id) == ("a", "a", dict(x=1), 1)
+        assert (obj.age, obj["age"], obj.missing, obj["missing"]) == (0, 0, None, None)
+        assert obj.to_dict() == model(**DOC).to_dict()
+
+
+def test_lazy_object_changes():
+    for model in (User, Compact):
+        obj = model.from_raw(bson.encode(DOC), OPTS)
+        obj.age = 3
+        obj["city"] = "x"
+        assert obj.__rawdoc__ is None  # materialized
+        assert (obj.name, obj.age, obj.city) == ("a", 3, "x")
+        assert obj.to_dict() == dict(DOC, age=3, city="x")
+
+
+def test_find_lazy(app):
+    User.insert_many([dict(_id=i, name=f"u{i}") for i in range(3)])
+    objects = User.find({}, sort="_id", lazy=True).objects
+    assert all(isinstance(obj, LazyMixin) for obj in objects)
+    assert [obj.name for obj in objects] == ["u0", "u1", "u2"]
+    assert not isinstance(User.find_one(1), LazyMixin)
+    assert isinstance(User.find_one(1, lazy=True), LazyMixin)
+    facet = User.find({}, sort="_id", lazy=True, count="facet")
+    assert all(isinstance(obj, LazyMixin) for obj in facet.objects)
+    assert [obj.name for obj in facet.objects] == ["u0", "u1", "u2"]
@@ -0,0 +1,66 @@
+import asyncio
+
+from flaskmongorm import BaseModel, FacetCursor
+from flaskmongorm.aio import TICK_LOADERS, AsyncBaseModel, loader_scope
+
+
+class Tenant(BaseModel):
+    __collection__ = "loader_tenants"
+
+
+class AsyncTenant(AsyncBaseModel):
+    __collection__ = "async_loader_tenants"
+    __dbs__ = {"testdb": None}
+
+    finds = []
+
+    @classmethod
+    async def find(cls, filter, **kwargs):
+        ids = filter["_id"]["$in"]
+        cls.finds.append(ids)
+        return FacetCursor([cls(_id=id) for id in ids if id < 5], None)
+
+
+def test_loader_batches_and_clears(app, monkeypatch):
+    Tenant.insert_many([dict(_id=i, n=i) for i in range(3)])
+    finds = []
+    find = Tenant.find.__func__
+
+    def count_find(cls, *args, **kwargs):
+        finds.append(args)
+        return find(cls, *args, **kwargs)
+
+    monkeypatch.setattr(Tenant, "find", classmethod(count_find))
+    futures = [Tenant.load(i) for i in (0, 1, 1, 5)]
+    assert [f.result() and f.result().n for f in futures] == [0, 1, 1, None]
+    assert len(finds) == 1
+    assert Tenant.load(1).result().n == 1 and len(finds) == 1  # kept
+    Tenant.delete_one({"_id": 1})
+    assert Tenant.load(1).result() is None and len(finds) == 2
+
+
+def test_async_loader_batches_one_tick():
+    async def main():
+        objects = await asyncio.gather(*[AsyncTenant.load(i) for i in (0, 1, 1, 7)])
+        assert [obj and obj.id for obj in objects] == [0, 1, 1, None]
+        assert AsyncTenant.finds == [[0, 1, 7]]
+        assert not TICK_LOADERS  # not kept after the tick
+        await AsyncTenant.load(1)
+        assert len(AsyncTenant.finds) == 2
+
+    AsyncTenant.finds = []
+    asyncio.run(main())
+
+
+def test_async_loader_scope():
+    async def main():
+        with loader_scope():
+            await AsyncTenant.load(1)
+            await AsyncTenant.load(1)
+            assert AsyncTenant.finds == [[1]]
+            AsyncTenant.clear_cache()
+            await AsyncTenant.load(1)
+            assert AsyncTenant.finds == [[1], [1]]
+
+    AsyncTenant.finds = []
+    asyncio.run(main())
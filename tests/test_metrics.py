@@ -0,0 +1,83 @@
+import logging
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from flaskmongorm import (
+    BaseModel,
+    MeteredCursor,
+    disable_metrics,
+    enable_metrics,
+    metrics_response,
+)
+
+
+class Metered(BaseModel):
+    __collection__ = "metered"
+
+
+@pytest.fixture
+def calls():
+    """(model, action, seconds, docs, error) of callback"""
+    return []
+
+
+@pytest.fixture
+def metrics(app, calls):
+    def failing(*args):
+        raise ValueError("callback")
+
+    yield enable_metrics(lambda *args: calls.append(args), failing, buckets=(0.5, 10))
+    disable_metrics()
+
+
+def test_command_metrics(metrics, calls, caplog):
+    caplog.set_level(logging.ERROR)
+    Metered.insert_many([dict(_id=i) for i in range(3)])
+    assert isinstance(Metered.insert_one(dict(_id=1)), str)  # duplicate, captured
+    cur = Metered.find({}, sort="_id")
+    assert isinstance(cur, MeteredCursor) and len(cur.objects) == 3
+    assert Metered.find_one({"_id": 1}).id == 1
+    assert [(model, action, docs) for model, action, _, docs, _ in calls] == [
+        ("Metered", "insert_many", 3),
+        ("Metered", "insert_one", 0),
+        ("Metered", "find", 3),
+        ("Metered", "find_one", 1),
+    ]
+    assert isinstance(calls[1][4], DuplicateKeyError)
+    assert "metrics callback" in caplog.text  # logged, not raised
+
+    stats = metrics.get_stats()
+    assert stats[("Metered", "insert_one")]["errors"] == 1
+    assert stats[("Metered", "find")]["docs"] == 3
+    assert stats[("Metered", "find")]["buckets"] == {0.5: 1, 10: 0, float("inf"): 0}
+
+
+def test_cursor_recorded_when_closed(metrics, calls):
+    Metered.insert_many([dict(_id=i) for i in range(5)])
+    with Metered.find_iter({}, sort="_id") as objects:
+        assert [obj.id for _, obj in zip(range(2), objects)] == [0, 1]
+
+    assert calls[-1][1] == "find" and calls[-1][3] == 2  # consumed docs
+
+
+def test_prometheus_text(metrics):
+    Metered.insert_many([dict(_id=i) for i in range(3)])
+    Metered.insert_one(dict(_id=0))
+    text = metrics_response().get_data(as_text=True)
+    name = "flaskmongorm_command_duration_seconds"
+    labels = 'model="Metered",action="insert_many"'
+    for line in (
+        f"# TYPE {name} histogram",
+        f'{name}_bucket{{{labels},le="0.5"}} 1',
+        f'{name}_bucket{{{labels},le="10"}} 1',  # cumulative
+        f'{name}_bucket{{{labels},le="+Inf"}} 1',
+        f"{name}_count{{{labels}}} 1",
+        f"flaskmongorm_command_documents_total{{{labels}}} 3",
+        f"flaskmongorm_command_errors_total{{{labels}}} 0",
+        'flaskmongorm_command_errors_total{model="Metered",action="insert_one"} 1',
+    ):
+        assert line in text.splitlines()
+
+    disable_metrics()
+    assert metrics_response().get_data(as_text=True) == ""
@@ -0,0 +1,68 @@
+import pytest
+from pymongo.read_preferences import Nearest, Primary, Secondary, SecondaryPreferred
+
+from flaskmongorm import BaseModel
+
+
+class Report(BaseModel):
+    __collection__ = "reports"
+    __read_preference__ = "secondaryPreferred"
+    __analytics_read_preference__ = "secondary"
+    __max_staleness__ = 120
+
+
+@pytest.fixture
+def reads(app, monkeypatch):
+    """(action, read preference) of commands"""
+    reads = []
+    with_session = Report.with_session.__func__
+
+    def spy(cls, action, *args, **kwargs):
+        reads.append((action.__name__, action.__self__.read_preference))
+        return with_session(cls, action, *args, **kwargs)
+
+    monkeypatch.setattr(Report, "with_session", classmethod(spy))
+    return reads
+
+
+def test_read_preference():
+    assert Report.get_read_preference({}) == SecondaryPreferred(max_staleness=120)
+    assert Report.get_read_preference(dict(read_preference="nearest")) == Nearest(
+        max_staleness=120
+    )
+    assert Report.get_read_preference(dict(analytics=True)) == Secondary(
+        max_staleness=120
+    )
+    assert Report.get_read_preference(dict(max_staleness=90)) == SecondaryPreferred(
+        max_staleness=90
+    )
+    # primary doesn't accept maxStalenessSeconds
+    assert Report.get_read_preference(dict(read_preference="primary")) == Primary()
+    kwargs = dict(read_preference="primary", analytics=True, limit=1)
+    Report.get_read_preference(kwargs)
+    assert kwargs == dict(limit=1)
+
+
+def test_read_routing(reads):
+    Report.find({}, count=True)
+    Report.find({}, read_preference="primary", count=True)
+    Report.count_documents({}, analytics=True)
+    Report.find_one({}, read_preference="nearest")
+    Report.aggregate([], analytics=True)
+    assert reads == [
+        ("find", SecondaryPreferred(max_staleness=120)),
+        ("count_documents", SecondaryPreferred(max_staleness=120)),
+        ("find", Primary()),
+        ("count_documents", Primary()),
+        ("count_documents", Secondary(max_staleness=120)),
+        ("find_one", Nearest(max_staleness=120)),
+        ("aggregate", Secondary(max_staleness=120)),
+    ]
+
+
+def test_transaction_reads_primary(reads, fake_transactions):
+    with Report.transaction():
+        assert Report.get_read_preference(dict(analytics=True)) is None
+        Report.find_one({})
+
+    assert reads == [("find_one", Primary())]
@@ -0,0 +1,78 @@
+import pytest
+
+from flaskmongorm import BaseModel, Reference
+
+
+class Customer(BaseModel):
+    __collection__ = "customers"
+
+
+class Order(BaseModel):
+    __collection__ = "orders"
+    __references__ = dict(
+        customer=Reference(Customer, "customer_id"),
+        tags=Reference(lambda: Tag, "tag_ids", foreign_field="code", many=True),
+    )
+
+
+class Tag(BaseModel):
+    __collection__ = "tags"
+
+
+@pytest.fixture
+def orders(app, monkeypatch):
+    Customer.insert_many([dict(_id=1, name="a"), dict(_id=2, name="b")])
+    Tag.insert_many([dict(_id=i, code=code) for i, code in enumerate("xyz")])
+    Order.insert_many(
+        [
+            dict(_id=1, customer_id=1, tag_ids=["x", "z"]),
+            dict(_id=2, customer_id=3, tag_ids=["y", "missing"]),  # no customer 3
+            dict(_id=3, customer_id=1),
+        ]
+    )
+    actions = []
+    with_session = BaseModel.with_session.__func__
+
+    def spy(cls, action, *args, **kwargs):
+        actions.append((cls.__name__, action.__name__))
+        return with_session(cls, action, *args, **kwargs)
+
+    monkeypatch.setattr(BaseModel, "with_session", classmethod(spy))
+    return actions
+
+
+def check(objects) -> None:
+    assert [obj.id for obj in objects] == [1, 2, 3]
+    assert [obj.customer and obj.customer.name for obj in objects] == ["a", None, "a"]
+    assert [[tag.code for tag in obj.tags] for obj in objects] == [
+        ["x", "z"],
+        ["y"],
+        [],
+    ]
+    assert "customer" not in objects[0].to_dict()  # not a field
+
+
+def test_lookup(orders):
+    cur = Order.find({}, prefetch=["customer", "tags"], sort="_id", limit=10)
+    check(cur.objects)
+    assert orders == [("Order", "aggregate")]  # one round trip
+
+
+def test_prefetch_by_in(orders):
+    cur = Order.find({}, prefetch=["customer", "tags"], sort="_id", count=True)
+    check(cur.objects)
+    assert cur.total == 3
+    assert orders == [
+        ("Order", "find"),
+        ("Order", "count_documents"),
+        ("Customer", "find"),
+        ("Tag", "find"),
+    ]
+
+
+def test_prefetch_raw(orders):
+    docs = Order.find({}, with_related="customer", sort="_id", as_raw=True).objects
+    customer = dict(_id=1, name="a")
+    assert [doc["customer"] for doc in docs] == [customer, None, customer]
+    objects = Order.prefetch(Order.find({"_id": 2}).objects, "tags")
+    assert [tag.code for tag in objects[0].tags] == ["y"]
@@ -0,0 +1,35 @@
+from pymongo import ASCENDING, DESCENDING, TEXT
+
+from flaskmongorm import clear_sort_cache, get_sort, get_sort_cache_info
+
+
+def test_get_sort():
+    assert get_sort("name, age desc") == [("name", ASCENDING), ("age", DESCENDING)]
+    assert get_sort("a;b text", for_index=True) == [
+        [("a", ASCENDING)],
+        [("b", TEXT)],
+    ]
+    assert get_sort(None) is None
+    sort = [("a", DESCENDING)]
+    assert get_sort(sort) is sort
+
+
+def test_cached_sort_is_not_shared():
+    clear_sort_cache()
+    sort = get_sort("name desc")
+    sort.append(("_id", ASCENDING))
+    sort[0] = ("other", ASCENDING)
+    assert get_sort("name desc") == [("name", DESCENDING)]
+    assert get_sort("name desc") is not get_sort("name desc")
+    info = get_sort_cache_info()
+    assert info.misses == 1 and info.hits == 3
+
+
+def test_cached_index_spec_is_not_shared():
+    clear_sort_cache()
+    specs = get_sort("a;b desc", for_index=True)
+    specs[0].append(("c", ASCENDING))
+    assert get_sort("a;b desc", for_index=True) == [
+        [("a", ASCENDING)],
+        [("b", DESCENDING)],
+    ]
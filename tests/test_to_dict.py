@@ -0,0 +1,71 @@
+import copy
+import itertools
+
+from flaskmongorm import BaseModel
+
+
+class Profile(BaseModel):
+    __collection__ = "profiles"
+    __default_values__ = dict(age=0, tags=[], level=1)
+
+
+class CompactProfile(Profile):
+    __collection__ = "compact_profiles"
+    __fields__ = ["_id", "name", "age", "sub"]
+
+
+def old_to_dict(
+    obj, include_defaults=True, deep=True, extras={}, excludes=[], onlys=[]
+) -> dict:
+    """to_dict() before filtering moved ahead of copying"""
+    fields = obj._get_fields()
+    d = copy.deepcopy(fields) if deep else copy.copy(fields)
+    if include_defaults:
+        for k, v in obj.__class__.__all_defaults__.items():
+            d.setdefault(k, v)
+
+    d.update(extras)
+    if onlys:
+        return {k: v for k, v in d.items() if k in onlys}
+
+    return {k: v for k, v in d.items() if k not in excludes}
+
+
+def test_same_as_old_to_dict():
+    options = dict(
+        include_defaults=(True, False),
+        deep=(True, False),
+        extras=({}, dict(name="x"), dict(level=5, new=1)),
+        excludes=([], ["sub", "level"], ["missing"]),
+        onlys=([], ["level", "name", "_id"], ["new", "tags"]),
+    )
+    for model in (Profile, CompactProfile):
+        obj = model(sub=dict(x=[1]), name="a", _id=1, tags=["t"])
+        for values in itertools.product(*options.values()):
+            kwargs = dict(zip(options, values))
+            d = obj.to_dict(**kwargs)
+            assert list(d.items()) == list(old_to_dict(obj, **kwargs).items())
+            view = obj.to_dict(view=True, **kwargs)
+            assert dict(view) == d
+
+
+def test_copies():
+    obj = Profile(_id=1, sub=dict(x=[1]))
+    assert obj.to_dict()["sub"] is not obj.sub
+    assert obj.to_dict()["sub"]["x"] is not obj.sub["x"]
+    assert obj.to_dict(deep=False)["sub"] is obj.sub
+    view = obj.to_dict(view=True, onlys=["sub"])
+    assert view["sub"] is obj.sub
+    view["name"] = "b"  # not written to object
+    assert obj.name is None
+
+
+def test_find_onlys(app):
+    Profile.insert_one(dict(_id=1, name="a", sub=dict(x=1), age=3))
+    obj = Profile.find_one(1, onlys=["name"])
+    assert obj._get_fields() == dict(_id=1, name="a")
+    assert obj.to_dict(onlys=["name"]) == dict(name="a")
+    objects = Profile.find({}, onlys=["sub"]).objects
+    assert objects[0]._get_fields() == dict(_id=1, sub=dict(x=1))
+    full = Profile.find_one(1, {"age": 1}, onlys=["name"])  # projection wins
+    assert full._get_fields() == dict(_id=1, age=3)
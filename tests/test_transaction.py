@@ -0,0 +1,87 @@
+import pytest
+from flask import Flask
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+from flaskmongorm import BaseModel
+
+
+class Account(BaseModel):
+    __collection__ = "accounts"
+
+
+class Entry(BaseModel):
+    __collection__ = "entries"
+
+
+def test_errors_raise_in_transaction(fake_transactions):
+    Account.insert_one(dict(_id=1))
+    assert isinstance(Account.insert_one(dict(_id=1)), str)  # captured
+    with pytest.raises(DuplicateKeyError):
+        with Account.transaction():
+            Account.insert_one(dict(_id=1))
+
+    assert fake_transactions[-1].ended == ["abort"]
+    assert Account.get_session() is None
+
+
+def test_run_in_transaction_retries(fake_transactions):
+    calls = []
+
+    def transfer():
+        calls.append(Account.get_session())
+        if len(calls) == 1:
+            raise PyMongoError("conflict", error_labels=["TransientTransactionError"])
+
+        return Account.update_one({"_id": 1}, {"$inc": {"n": 1}}, upsert=True)
+
+    assert Account.run_in_transaction(transfer).upserted_id == 1
+    assert calls == fake_transactions
+    assert [sess.ended for sess in calls] == [["abort"], ["commit"]]
+
+
+@pytest.fixture
+def rs_app(replica_set_uri):
+    app = Flask(__name__)
+    BaseModel.init_app(app, uri=replica_set_uri)
+    with app.app_context():
+        for model in (Account, Entry):
+            model.delete_many({})
+
+        yield app
+
+
+def test_commit(rs_app):
+    with Account.transaction() as sess:
+        Account.insert_one(dict(_id=1, n=10))
+        assert Account.get_collection().count_documents({}) == 0  # not committed
+        with Entry.transaction() as nested:  # same db key, same session
+            assert nested is sess is Entry.get_session()
+            Entry.insert_one(dict(account=1, n=10))
+
+        assert Account.find_one(1).n == 10  # reads in the session
+
+    assert Account.get_session() is None
+    assert Account.count_documents({}) == Entry.count_documents({}) == 1
+
+
+def test_rollback(rs_app):
+    Account.insert_one(dict(_id=1, n=10))
+    with pytest.raises(DuplicateKeyError):
+        with Account.transaction():
+            Account.update_one({"_id": 1}, {"$inc": {"n": -5}})
+            Entry.insert_one(dict(account=1, n=-5))
+            Account.insert_one(dict(_id=1))
+
+    assert Account.find_one(1).n == 10 and Entry.count_documents({}) == 0
+
+
+def test_run_in_transaction(rs_app):
+    Account.insert_one(dict(_id=1, n=10))
+
+    def withdraw(n):
+        Account.update_one({"_id": 1}, {"$inc": {"n": -n}})
+        Entry.insert_one(dict(account=1, n=-n))
+        return Account.find_one(1).n
+
+    assert Account.run_in_transaction(withdraw, 3) == 7
+    assert Entry.count_documents({}) == 1
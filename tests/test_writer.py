@@ -0,0 +1,85 @@
+import pytest
+from pymongo.errors import WriteError
+
+from flaskmongorm import BaseModel, flush_bulk_writers, route_by_header
+
+
+class Log(BaseModel):
+    __collection__ = "logs"
+
+
+class TenantLog(BaseModel):
+    __collection__ = "tenant_logs"
+    __router__ = route_by_header("X-Tenant", {"a": "testdb", "b": "otherdb"})
+
+
+@pytest.fixture(autouse=True)
+def new_writers():
+    yield
+    for model in (Log, TenantLog):
+        if "__bulk_writer__" in model.__dict__:
+            del model.__bulk_writer__
+
+
+def test_bulk_writer_results(app):
+    writer = Log.get_bulk_writer(max_size=100, max_delay=0)
+    assert Log.get_bulk_writer() is writer
+    doc = dict(_id=1, n=1)
+    futures = [
+        writer.insert_one(doc),
+        writer.insert_one(dict(_id=1, n=2)),  # duplicate key
+        writer.insert_one(dict(_id=2, n=3)),
+        writer.delete_one({"_id": 1}),
+    ]
+    assert not any(future.done() for future in futures)
+    writer.flush()
+    assert futures[0].result()["inserted_id"] == 1
+    with pytest.raises(WriteError):
+        futures[1].result()
+
+    assert futures[2].result()["bulk_result"] is futures[3].result()["bulk_result"]
+    assert [obj.to_dict() for obj in Log.find({}).objects] == [dict(_id=2, n=3)]
+
+
+def test_bulk_writer_max_size(app):
+    writer = Log.get_bulk_writer(max_size=2, max_delay=0)
+    first = writer.insert_one(dict(_id=10))
+    assert not first.done()
+    writer.insert_one(dict(_id=11))
+    assert first.done() and Log.count_documents({}) == 2
+
+
+def test_bulk_writer_routes_by_queuing_db(app, client, monkeypatch):
+    monkeypatch.setitem(BaseModel.__dbs__, "otherdb", client["otherdb"])
+    writer = TenantLog.get_bulk_writer(max_size=100, max_delay=0)
+    for tenant in ("a", "b"):
+        with app.app_context(), app.test_request_context(headers={"X-Tenant": tenant}):
+            writer.insert_one(dict(tenant=tenant))
+
+    flush_bulk_writers()  # outside of both requests
+    for dbname, tenant in (("testdb", "a"), ("otherdb", "b")):
+        docs = client[dbname]["tenant_logs"].find({}, {"_id": 0})
+        assert list(docs) == [dict(tenant=tenant)]
+
+
+def test_route_by_header(app):
+    with app.app_context(), app.test_request_context(headers={"X-Tenant": "otherdb"}):
+        assert TenantLog.get_db_key() == "testdb"  # not a listed value
+
+    with pytest.raises(TypeError):
+        route_by_header("X-Tenant", None)
+
+
+def test_flush_errors_on_teardown(app, monkeypatch, caplog):
+    class Down:
+        def bulk_write(self, *args, **kwargs):
+            raise ConnectionError("down")
+
+    writer = Log.get_bulk_writer(max_size=100, max_delay=0)
+    future = writer.insert_one(dict(_id=20))
+    monkeypatch.setattr(
+        Log, "get_wrapped_coll", classmethod(lambda cls, *a, **k: Down())
+    )
+    flush_bulk_writers()
+    assert isinstance(future.exception(), ConnectionError)
+    assert "flushing bulk writer" in caplog.text